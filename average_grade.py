@@ -12,8 +12,73 @@ Usage (non-interactive):
 
 Optional: you can pass three scores as command-line arguments:
   python3 average_grade.py 8 7 6
+
+Gradebook mode (whole class, streamed from CSV in constant memory):
+  python3 average_grade.py --gradebook grades.csv [results.csv]
+  cat grades.csv | python3 average_grade.py --gradebook -
+
+Each gradebook row is "<id>,<score>,<score>,..." with any number of scores;
+a non-numeric first row is treated as a header and skipped. Output rows are
+"<id>,<average>,<result>" using the same >= 7.0 rule, followed by run totals
+(on stderr when the rows go to stdout). Rows that cannot be parsed are counted
+and skipped.
+
+Class statistics mode (same CSV format, split across CPU cores):
+  python3 average_grade.py --stats grades.csv [--workers 8]
+
+The file is cut into line-aligned byte-range shards (line_shards.py), one per
+worker process. Each worker summarizes the student averages in its shard
+(count, approved, running mean and variance, and a quantile sketch) and the
+partial summaries are merged. Counts, mean and variance merge exactly (up to
+float rounding); the median, p90 and p99 come from a log-bucketed sketch whose
+answers are within SKETCH_RELATIVE_ERROR (0.5%) of the true value, however the
+file is split.
+
+Binary gradebooks (convert once, then query without re-parsing text):
+  python3 average_grade.py --convert grades.csv grades.grdb [--float32]
+  python3 average_grade.py --query grades.grdb           # class totals
+  python3 average_grade.py --query grades.grdb s123      # one student
+
+A .grdb file holds a fixed header with the run totals, a float64 column of
+student averages, one float32/float64 column per score, and the student ids
+with an on-disk hash index. Queries memory-map the file and read the columns
+through memoryview casts, so nothing is copied or parsed; the totals come
+straight from the header and a lookup touches a handful of pages.
 """
+import math
+import mmap
+import os
+import shutil
+import struct
 import sys
+import tempfile
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from line_shards import iter_line_chunks, open_shard, shard_count, shard_ranges, take_workers
+
+
+PASSING_AVERAGE = 7.0
+
+# Bytes of input handed to readlines() per chunk in gradebook mode
+GRADEBOOK_CHUNK_SIZE = 1 << 20
+
+# Relative accuracy of median/p90/p99 in --stats mode
+SKETCH_RELATIVE_ERROR = 0.005
+
+# Files smaller than this are summarized in-process instead of sharded
+MIN_SHARD_SIZE = 4 << 20
+
+# .grdb layout: header, then 8-byte aligned sections at the recorded offsets:
+# averages (float64 x rows), scores (itemsize x rows, one column after
+# another), id offsets (uint64 x rows+1), id bytes, hash index (uint64 slots
+# holding row + 1, 0 = empty, linear probing on crc32 of the id).
+GRDB_MAGIC = b'GRDB'
+GRDB_VERSION = 1
+GRDB_HEADER = struct.Struct('<4sHHIQQQd6Q')
+GRDB_HEADER_SIZE = 128
 
 
 def parse_score(s):
@@ -37,7 +102,558 @@ def read_score(prompt_text):
     return parse_score(s)
 
 
+def chunk_averages(lines):
+    # One chunk of "<id>,<s1>,<s2>,..." rows (str or bytes) -> (ids,
+    # averages, invalid) for the rows that parse. Rather than splitting each
+    # row into its own list, the score fields of the whole chunk are joined
+    # and parsed by a single split() and float() pass into one array, and
+    # every row sums its share of it (in the same order as a per-row sum).
+    # Only a chunk containing a bad row is re-parsed row by row to find it.
+    comma = b',' if lines and isinstance(lines[0], bytes) else ','
+    ids = []
+    counts = []
+    rests = []
+    invalid = 0
+    for line in lines:
+        sid, sep, rest = line.partition(comma)
+        if sep:
+            ids.append(sid)
+            counts.append(rest.count(comma) + 1)
+            rests.append(rest)
+        elif line.strip():
+            invalid += 1
+    if not rests:
+        return ids, [], invalid
+    try:
+        values = iter(array('d', map(float, comma.join(rests).split(comma))))
+    except ValueError:
+        return _checked_row_averages(ids, rests, invalid, comma)
+    return ids, [sum(islice(values, n)) / n for n in counts], invalid
+
+
+def _checked_row_averages(ids, rests, invalid, comma):
+    good_ids = []
+    averages = []
+    for sid, rest in zip(ids, rests):
+        try:
+            avg = sum(map(float, rest.split(comma))) / (rest.count(comma) + 1)
+        except ValueError:
+            invalid += 1
+            continue
+        good_ids.append(sid)
+        averages.append(avg)
+    return good_ids, averages, invalid
+
+
+def row_average(line):
+    # "<id>,<s1>,<s2>,..." -> (id, average); raises ValueError on a bad row
+    ids, averages, _ = chunk_averages([line])
+    if not averages:
+        raise ValueError('not a gradebook row')
+    return ids[0].strip(), averages[0]
+
+
+def new_totals():
+    return {'students': 0, 'approved': 0, 'invalid': 0, 'average_sum': 0.0}
+
+
+def grade_lines(lines, totals):
+    # Grades one chunk of rows and returns its output as a single string
+    out = []
+    append = out.append
+    ids, averages, invalid = chunk_averages(lines)
+    students = approved = 0
+    average_sum = 0.0
+    passing = PASSING_AVERAGE
+    for sid, avg in zip(ids, averages):
+        students += 1
+        average_sum += avg
+        if avg >= passing:
+            approved += 1
+            append(f"{sid.strip()},{avg:.2f},Approved\n")
+        else:
+            append(f"{sid.strip()},{avg:.2f},Not approved\n")
+    totals['students'] += students
+    totals['approved'] += approved
+    totals['invalid'] += invalid
+    totals['average_sum'] += average_sum
+    return ''.join(out)
+
+
+def process_gradebook(infile, outfile, chunk_size=GRADEBOOK_CHUNK_SIZE):
+    totals = new_totals()
+    first = infile.readline()
+    try:
+        row_average(first)
+    except ValueError:
+        first = ''  # header (or empty input)
+    outfile.write('id,average,result\n')
+    outfile.write(grade_lines([first], totals))
+    while True:
+        lines = infile.readlines(chunk_size)
+        if not lines:
+            break
+        outfile.write(grade_lines(lines, totals))
+    return totals
+
+
+def print_totals(totals, file):
+    students = totals['students']
+    print(f"Students: {students}", file=file)
+    print(f"Approved: {totals['approved']}", file=file)
+    print(f"Not approved: {students - totals['approved']}", file=file)
+    if totals['invalid']:
+        print(f"Invalid rows skipped: {totals['invalid']}", file=file)
+    if students:
+        print(f"Class average: {totals['average_sum'] / students:.2f}", file=file)
+
+
+def gradebook_main(args):
+    in_path = args[0] if args else '-'
+    out_path = args[1] if len(args) >= 2 else None
+    try:
+        if in_path == '-':
+            infile = sys.stdin
+        else:
+            infile = open(in_path, 'r', buffering=GRADEBOOK_CHUNK_SIZE)
+        if out_path is None:
+            outfile = open(sys.stdout.fileno(), 'w', buffering=GRADEBOOK_CHUNK_SIZE, closefd=False)
+        else:
+            outfile = open(out_path, 'w', buffering=GRADEBOOK_CHUNK_SIZE)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        totals = process_gradebook(infile, outfile)
+    finally:
+        outfile.flush()
+        if out_path is not None:
+            outfile.close()
+        if infile is not sys.stdin:
+            infile.close()
+    print_totals(totals, sys.stderr if out_path is None else sys.stdout)
+
+
+class QuantileSketch:
+    # Log-bucketed sketch: a value x > 0 is counted in bucket ceil(log_gamma(x)),
+    # so every value in a bucket is within the relative error of the bucket's
+    # representative. Sketches with the same error merge exactly by adding
+    # bucket counts.
+    __slots__ = ('relative_error', 'log_gamma', 'positive', 'negative', 'zero', 'count')
+
+    def __init__(self, relative_error=SKETCH_RELATIVE_ERROR):
+        self.relative_error = relative_error
+        self.log_gamma = math.log((1 + relative_error) / (1 - relative_error))
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+
+    def add_many(self, values):
+        log_gamma = self.log_gamma
+        positive = self.positive
+        negative = self.negative
+        log = math.log
+        ceil = math.ceil
+        for x in values:
+            if x > 0:
+                key = ceil(log(x) / log_gamma)
+                positive[key] = positive.get(key, 0) + 1
+            elif x < 0:
+                key = ceil(log(-x) / log_gamma)
+                negative[key] = negative.get(key, 0) + 1
+            else:
+                self.zero += 1
+        self.count += len(values)
+
+    def merge(self, other):
+        if other.relative_error != self.relative_error:
+            raise ValueError('Cannot merge sketches with different relative errors')
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, cnt in theirs.items():
+                mine[key] = mine.get(key, 0) + cnt
+        self.zero += other.zero
+        self.count += other.count
+
+    def _value(self, key):
+        return 2.0 * math.exp(key * self.log_gamma) / (1.0 + math.exp(self.log_gamma))
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = int(q * (self.count - 1))
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+
+class GradeSummary:
+    # Mergeable summary of student averages; mean/m2 follow Welford/Chan so
+    # partial summaries from different shards combine without the raw data.
+    __slots__ = ('students', 'approved', 'invalid', 'mean', 'm2', 'sketch')
+
+    def __init__(self):
+        self.students = 0
+        self.approved = 0
+        self.invalid = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = QuantileSketch()
+
+    def _combine(self, n, mean, m2):
+        total = self.students + n
+        if total == 0:
+            return
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.students * n / total
+        self.students = total
+
+    def add_chunk(self, averages):
+        # Two-pass moments over one bounded chunk, then a Chan merge
+        n = len(averages)
+        if n == 0:
+            return
+        mean = math.fsum(averages) / n
+        m2 = math.fsum([(a - mean) * (a - mean) for a in averages])
+        self._combine(n, mean, m2)
+        passing = PASSING_AVERAGE
+        self.approved += sum(1 for a in averages if a >= passing)
+        self.sketch.add_many(averages)
+
+    def merge(self, other):
+        self._combine(other.students, other.mean, other.m2)
+        self.approved += other.approved
+        self.invalid += other.invalid
+        self.sketch.merge(other.sketch)
+        return self
+
+    def variance(self):
+        return self.m2 / self.students if self.students else 0.0
+
+
+def _chunk_averages(lines, summary):
+    _, parsed, invalid = chunk_averages(lines)
+    summary.invalid += invalid
+    averages = [avg for avg in parsed if math.isfinite(avg)]
+    summary.invalid += len(parsed) - len(averages)
+    return averages
+
+
+def summarize_shard(path, start, end, chunk_size=GRADEBOOK_CHUNK_SIZE):
+    summary = GradeSummary()
+    with open_shard(path, start) as f:
+        if f.tell() == 0 and end > 0:
+            first = f.readline()
+            try:
+                row_average(first.decode('utf-8', 'replace'))
+            except ValueError:
+                first = b''  # header
+            summary.add_chunk(_chunk_averages([first], summary))
+        for lines in iter_line_chunks(f, chunk_size, end):
+            summary.add_chunk(_chunk_averages(lines, summary))
+    return summary
+
+
+def summarize_gradebook(path, workers=None):
+    size = os.path.getsize(path)
+    shards = shard_count(size, workers, MIN_SHARD_SIZE)
+    if shards <= 1:
+        return summarize_shard(path, 0, size)
+    ranges = shard_ranges(size, shards)
+    total = GradeSummary()
+    with ProcessPoolExecutor(max_workers=shards) as pool:
+        futures = [pool.submit(summarize_shard, path, start, end) for start, end in ranges]
+        for fut in futures:
+            total.merge(fut.result())
+    return total
+
+
+def stats_main(args):
+    workers = take_workers(args)
+    if not args:
+        print("Usage: average_grade.py --stats grades.csv [--workers N]", file=sys.stderr)
+        sys.exit(1)
+    try:
+        summary = summarize_gradebook(args[0], workers)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Students: {summary.students}")
+    print(f"Approved: {summary.approved}")
+    print(f"Not approved: {summary.students - summary.approved}")
+    if summary.invalid:
+        print(f"Invalid rows skipped: {summary.invalid}")
+    if summary.students == 0:
+        return
+    err = SKETCH_RELATIVE_ERROR * 100
+    print(f"Mean average: {summary.mean:.4f}")
+    print(f"Variance: {summary.variance():.4f}")
+    print(f"Std deviation: {math.sqrt(summary.variance()):.4f}")
+    print(f"Median: {summary.sketch.quantile(0.5):.2f} (within {err:g}%)")
+    print(f"P90: {summary.sketch.quantile(0.9):.2f} (within {err:g}%)")
+    print(f"P99: {summary.sketch.quantile(0.99):.2f} (within {err:g}%)")
+
+
+def _align8(f):
+    pad = -f.tell() % 8
+    if pad:
+        f.write(bytes(pad))
+    return f.tell()
+
+
+def build_id_index(hashes):
+    # Open-addressing table at most half full; rows are inserted in order so
+    # a duplicate id resolves to its first row.
+    slots = 1
+    while slots < 2 * len(hashes):
+        slots *= 2
+    mask = slots - 1
+    table = array('Q', bytes(8 * slots))
+    for row, h in enumerate(hashes, start=1):
+        i = h & mask
+        while table[i]:
+            i = (i + 1) & mask
+        table[i] = row
+    return table
+
+
+def convert_gradebook(in_path, out_path, itemsize=8, chunk_size=GRADEBOOK_CHUNK_SIZE):
+    typecode = 'd' if itemsize == 8 else 'f'
+    n_scores = None
+    rows = approved = invalid = 0
+    average_sum = 0.0
+    hashes = array('I')
+    id_end = 0
+    columns = []
+    averages_tmp = tempfile.TemporaryFile()
+    offsets_tmp = tempfile.TemporaryFile()
+    ids_tmp = tempfile.TemporaryFile()
+    array('Q', [0]).tofile(offsets_tmp)
+    try:
+        with open(in_path, 'rb') as f:
+            first = f.readline()
+            try:
+                row_average(first.decode('utf-8', 'replace'))
+                pending = [first]
+            except ValueError:
+                pending = []  # header
+            while True:
+                lines = pending + f.readlines(chunk_size)
+                pending = []
+                if not lines:
+                    break
+                averages = array('d')
+                offsets = array('Q')
+                ids = []
+                chunk_cols = None
+                for line in lines:
+                    sid, sep, rest = line.partition(b',')
+                    try:
+                        if not sep:
+                            raise ValueError
+                        scores = [float(x) for x in rest.split(b',')]
+                    except ValueError:
+                        if line.strip():
+                            invalid += 1
+                        continue
+                    if n_scores is None:
+                        n_scores = len(scores)
+                        columns = [tempfile.TemporaryFile() for _ in range(n_scores)]
+                    if len(scores) != n_scores:
+                        invalid += 1
+                        continue
+                    if chunk_cols is None:
+                        chunk_cols = [array(typecode) for _ in range(n_scores)]
+                    for col, score in zip(chunk_cols, scores):
+                        col.append(score)
+                    avg = sum(scores) / n_scores
+                    averages.append(avg)
+                    average_sum += avg
+                    if avg >= PASSING_AVERAGE:
+                        approved += 1
+                    sid = sid.strip()
+                    ids.append(sid)
+                    id_end += len(sid)
+                    offsets.append(id_end)
+                    hashes.append(zlib.crc32(sid))
+                    rows += 1
+                if chunk_cols is not None:
+                    for col, tmp in zip(chunk_cols, columns):
+                        col.tofile(tmp)
+                averages.tofile(averages_tmp)
+                offsets.tofile(offsets_tmp)
+                ids_tmp.write(b''.join(ids))
+
+        index = build_id_index(hashes)
+        del hashes
+        with open(out_path, 'wb') as out:
+            out.write(bytes(GRDB_HEADER_SIZE))
+            sections = []
+            for tmp in [averages_tmp] + columns + [offsets_tmp, ids_tmp]:
+                sections.append(_align8(out))
+                tmp.seek(0)
+                shutil.copyfileobj(tmp, out, GRADEBOOK_CHUNK_SIZE)
+            index_off = _align8(out)
+            index.tofile(out)
+            out.seek(0)
+            out.write(GRDB_HEADER.pack(
+                GRDB_MAGIC, GRDB_VERSION, itemsize, n_scores or 0, rows, approved, invalid,
+                average_sum, sections[0], sections[1], sections[-2], sections[-1],
+                index_off, len(index)))
+    finally:
+        for tmp in [averages_tmp, offsets_tmp, ids_tmp] + columns:
+            tmp.close()
+    return {'students': rows, 'approved': approved, 'invalid': invalid, 'average_sum': average_sum}
+
+
+class GradebookFile:
+    # Read-only, memory-mapped view of a .grdb file
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if len(self._view) < GRDB_HEADER_SIZE:
+            self.close()
+            raise ValueError(f"{path}: not a gradebook file")
+        (magic, version, self.itemsize, self.n_scores, self.students, self.approved,
+         self.invalid, self.average_sum, averages_off, scores_off, id_offsets_off,
+         ids_off, index_off, index_slots) = GRDB_HEADER.unpack_from(self._view)
+        if magic != GRDB_MAGIC or version != GRDB_VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a gradebook file (or unsupported version)")
+        n = self.students
+        v = self._view
+        typecode = 'd' if self.itemsize == 8 else 'f'
+        self.averages = v[averages_off:averages_off + 8 * n].cast('d')
+        col_bytes = self.itemsize * n
+        self.scores = [v[scores_off + j * col_bytes:scores_off + (j + 1) * col_bytes].cast(typecode)
+                       for j in range(self.n_scores)]
+        self._id_offsets = v[id_offsets_off:id_offsets_off + 8 * (n + 1)].cast('Q')
+        self._ids = v[ids_off:index_off]
+        self._index = v[index_off:index_off + 8 * index_slots].cast('Q')
+
+    def totals(self):
+        return {'students': self.students, 'approved': self.approved,
+                'invalid': self.invalid, 'average_sum': self.average_sum}
+
+    def student_id(self, row):
+        return bytes(self._ids[self._id_offsets[row]:self._id_offsets[row + 1]]).decode('utf-8', 'replace')
+
+    def find(self, student_id):
+        # Row number of student_id, or None
+        key = student_id.encode('utf-8')
+        index = self._index
+        if not len(index):
+            return None
+        mask = len(index) - 1
+        offsets = self._id_offsets
+        ids = self._ids
+        i = zlib.crc32(key) & mask
+        while True:
+            row = index[i]
+            if row == 0:
+                return None
+            row -= 1
+            if ids[offsets[row]:offsets[row + 1]] == key:
+                return row
+            i = (i + 1) & mask
+
+    def lookup(self, student_id):
+        # (average, [scores]) for one student, or None
+        row = self.find(student_id)
+        if row is None:
+            return None
+        return self.averages[row], [col[row] for col in self.scores]
+
+    def close(self):
+        for name in ('averages', 'scores', '_id_offsets', '_ids', '_index'):
+            value = getattr(self, name, None)
+            if isinstance(value, list):
+                for mv in value:
+                    mv.release()
+            elif value is not None:
+                value.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert_main(args):
+    itemsize = 8
+    if '--float32' in args:
+        args.remove('--float32')
+        itemsize = 4
+    if len(args) < 2:
+        print("Usage: average_grade.py --convert grades.csv grades.grdb [--float32]", file=sys.stderr)
+        sys.exit(1)
+    try:
+        totals = convert_gradebook(args[0], args[1], itemsize)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Wrote {args[1]}")
+    print_totals(totals, sys.stdout)
+
+
+def query_main(args):
+    if not args:
+        print("Usage: average_grade.py --query grades.grdb [student_id]", file=sys.stderr)
+        sys.exit(1)
+    try:
+        book = GradebookFile(args[0])
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    with book:
+        if len(args) < 2:
+            print_totals(book.totals(), sys.stdout)
+            return
+        found = book.lookup(args[1])
+        if found is None:
+            print(f"Student not found: {args[1]}", file=sys.stderr)
+            sys.exit(1)
+        avg, scores = found
+        print(f"Student: {args[1]}")
+        print("Scores: " + ", ".join(f"{x:.2f}" for x in scores))
+        print(f"Average: {avg:.2f}")
+        print("Result: Approved" if avg >= PASSING_AVERAGE else "Result: Not approved")
+
+
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--convert':
+        convert_main(sys.argv[2:])
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == '--query':
+        query_main(sys.argv[2:])
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == '--gradebook':
+        gradebook_main(sys.argv[2:])
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == '--stats':
+        stats_main(sys.argv[2:])
+        return
+
     # Allow passing scores as command-line arguments for convenience
     if len(sys.argv) >= 4:
         vals = [parse_score(x) for x in sys.argv[1:4]]
@@ -73,7 +689,7 @@ def main():
     print(f"Scores: A={a:.2f}, B={b:.2f}, C={c:.2f}")
     print(f"Average: {avg:.2f}")
 
-    if avg >= 7.0:
+    if avg >= PASSING_AVERAGE:
         print("Result: Approved")
     else:
         print("Result: Not approved")
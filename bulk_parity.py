@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+bulk_parity.py
+Even/odd classification for whole integer columns, the bulk counterpart of
+odd_or_even.py.
+
+Inputs:
+  .npy          any 1-D (or C-ordered) integer array, memory-mapped
+  .csv / .txt   one integer per line, or --column N of a comma-separated file
+                (a non-numeric first line is taken as a header)
+  anything else raw little-endian int64, memory-mapped
+
+Usage:
+  python3 bulk_parity.py ids.npy
+  python3 bulk_parity.py ids.i64 --odd odd.npy --even even.u8 [--workers 8]
+  python3 bulk_parity.py ids.csv --column 2 --odd odd.u8
+
+Parity only depends on the lowest byte of each value, so the engine reads
+that byte out of the buffer (a strided view, no copy) and ANDs it with 1.
+--odd/--even write a uint8 mask with one 0/1 byte per value, as .npy when
+the name ends in .npy and raw bytes otherwise. Memory-mapped inputs of at
+least twice MIN_SHARD_VALUES values are split into ranges across a process
+pool; each worker maps the input and the output masks itself, so nothing
+but the counts crosses the process boundary. CSV files of at least twice
+MIN_CSV_SHARD_BYTES are split at line boundaries instead (line_shards.py);
+each worker
+parses its byte range and writes its masks to temporary files that the
+parent appends in order.
+
+Without NumPy, raw int64 files are still handled by slicing out the low
+bytes with bytes operations, and CSV values are parsed with int().
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from line_shards import (iter_line_chunks, open_shard, shard_count, shard_ranges,
+                         take_workers, throughput_line)
+
+
+# Values classified per chunk (bounds the temporaries to a few MiB)
+CHUNK_VALUES = 1 << 22
+
+# Memory-mapped inputs are split into shards of at least this many values;
+# smaller inputs stay in-process
+MIN_SHARD_VALUES = 1 << 26
+
+# Lines of CSV input parsed per chunk
+CSV_CHUNK_BYTES = 1 << 22
+
+# CSV files are split into shards of at least this many bytes
+MIN_CSV_SHARD_BYTES = 16 << 20
+
+# byte -> its lowest bit, and 0/1 -> 1/0 (odd mask -> even mask)
+_LOW_BIT = bytes(b & 1 for b in range(256))
+_FLIP = bytes((1, 0)) + bytes(254)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def input_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npy':
+        return 'npy'
+    if ext in ('.csv', '.txt'):
+        return 'csv'
+    return 'raw'
+
+
+def load_values(path, fmt=None):
+    # Memory-mapped 1-D integer array for an .npy or raw int64 file
+    np = _numpy()
+    fmt = fmt or input_format(path)
+    if np is None:
+        raise ValueError('Reading .npy files requires NumPy')
+    if fmt == 'npy':
+        values = np.load(path, mmap_mode='r')
+        if values.dtype.kind not in 'iu':
+            raise ValueError(f"{path}: expected an integer array, got {values.dtype}")
+        if not values.flags.c_contiguous:
+            raise ValueError(f"{path}: expected a C-ordered array")
+        return values.reshape(-1)
+    size = os.path.getsize(path)
+    if size % 8:
+        raise ValueError(f"{path}: size {size} is not a multiple of 8 bytes")
+    if size == 0:
+        return np.empty(0, dtype='<i8')
+    return np.memmap(path, dtype='<i8', mode='r')
+
+
+def odd_mask(values, out=None):
+    # uint8 array, 1 where the value is odd. Works on any integer dtype by
+    # viewing its lowest byte in place.
+    np = _numpy()
+    itemsize = values.dtype.itemsize
+    if itemsize == 1:
+        low = values.view(np.uint8)
+    else:
+        big = values.dtype.byteorder == '>' or (values.dtype.byteorder == '=' and sys.byteorder == 'big')
+        low = values.view(np.uint8)[itemsize - 1 if big else 0::itemsize]
+    if out is None:
+        out = np.empty(len(values), dtype=np.uint8)
+    return np.bitwise_and(low, 1, out=out)
+
+
+def _create_mask(path, count):
+    # Zero-filled mask of `count` bytes for the workers to _open_mask()
+    np = _numpy()
+    if path.endswith('.npy'):
+        with open(path, 'wb') as f:
+            np.lib.format.write_array_header_1_0(
+                f, {'descr': '|u1', 'fortran_order': False, 'shape': (count,)})
+            f.truncate(f.tell() + count)
+        return
+    with open(path, 'wb') as f:
+        f.truncate(count)
+
+
+def _open_mask(path):
+    np = _numpy()
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r+')
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode='r+')
+
+
+def classify_values(values, odd_out=None, even_out=None):
+    # Fills the optional uint8 masks and returns the number of odd values
+    np = _numpy()
+    buf = np.empty(min(CHUNK_VALUES, len(values)), dtype=np.uint8)
+    odd = 0
+    for start in range(0, len(values), CHUNK_VALUES):
+        stop = min(start + CHUNK_VALUES, len(values))
+        mask = odd_mask(values[start:stop], out=buf[:stop - start])
+        odd += int(np.count_nonzero(mask))
+        if odd_out is not None:
+            odd_out[start:stop] = mask
+        if even_out is not None:
+            np.bitwise_xor(mask, 1, out=even_out[start:stop])
+    return odd
+
+
+def classify_range(path, fmt, start, stop, odd_path=None, even_path=None):
+    # Worker: classifies values [start, stop) of a memory-mapped input
+    values = load_values(path, fmt)[start:stop]
+    odd_out = _open_mask(odd_path)[start:stop] if odd_path else None
+    even_out = _open_mask(even_path)[start:stop] if even_path else None
+    odd = classify_values(values, odd_out, even_out)
+    for out in (odd_out, even_out):
+        if out is not None and hasattr(out, 'flush'):
+            out.flush()
+    return odd
+
+
+def classify_mapped(path, fmt, odd_path=None, even_path=None, workers=None):
+    # -> (count, odd) for an .npy or raw int64 file
+    count = len(load_values(path, fmt))
+    for out_path in (odd_path, even_path):
+        if out_path:
+            _create_mask(out_path, count)
+    workers = workers or os.cpu_count() or 1
+    shards = min(workers, count // MIN_SHARD_VALUES)
+    if shards <= 1:
+        return count, classify_range(path, fmt, 0, count, odd_path, even_path)
+    step = -(-count // shards)
+    with ProcessPoolExecutor(max_workers=shards) as pool:
+        futures = [pool.submit(classify_range, path, fmt, start, min(start + step, count),
+                               odd_path, even_path)
+                   for start in range(0, count, step)]
+        return count, sum(fut.result() for fut in futures)
+
+
+def classify_raw_bytes(path, odd_file=None, even_file=None):
+    # NumPy-free path for raw little-endian int64: the low byte of every
+    # value is data[0::8], and translate() turns it into the 0/1 mask
+    size = os.path.getsize(path)
+    if size % 8:
+        raise ValueError(f"{path}: size {size} is not a multiple of 8 bytes")
+    odd = 0
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(CHUNK_VALUES * 8)
+            if not data:
+                break
+            mask = data[0::8].translate(_LOW_BIT)
+            odd += mask.count(1)
+            if odd_file is not None:
+                odd_file.write(mask)
+            if even_file is not None:
+                even_file.write(mask.translate(_FLIP))
+    return size // 8, odd
+
+
+def _csv_fields(lines, column):
+    try:
+        return [line.split(b',', column + 1)[column].strip() for line in lines]
+    except IndexError:
+        raise ValueError(f"Line without column {column}") from None
+
+
+def _parse_chunk(np, fields):
+    # int64 values for a list of byte strings; ValueError names the bad one
+    try:
+        if np is not None:
+            return np.array(fields).astype(np.int64)
+        return array('q', map(int, fields))
+    except (ValueError, OverflowError):
+        for field in fields:
+            try:
+                int(field)
+            except ValueError:
+                raise ValueError(f"Invalid integer: {field.decode('utf-8', 'replace')}") from None
+        raise ValueError('Value out of int64 range') from None
+
+
+def classify_csv(path, odd_file=None, even_file=None, column=0, start=0, end=None):
+    # -> (count, odd); masks are appended to the open binary files. With
+    # `end`, only the lines starting inside [start, end) are classified, and
+    # only the range starting at 0 can have a header.
+    np = _numpy()
+    count = odd = 0
+    first = start == 0
+    with open_shard(path, start) as f:
+        for lines in iter_line_chunks(f, CSV_CHUNK_BYTES, end):
+            lines = [line for line in lines if line.strip()]
+            if not lines:
+                continue
+            fields = _csv_fields(lines, column)
+            if first:
+                first = False
+                head = fields[0].lstrip(b'+-')
+                if not head.isdigit():
+                    fields = fields[1:]
+                    if not fields:
+                        continue
+            values = _parse_chunk(np, fields)
+            if np is not None:
+                mask = odd_mask(values)
+                odd += int(np.count_nonzero(mask))
+                mask = mask.tobytes()
+            else:
+                mask = bytes(v & 1 for v in values)
+                odd += mask.count(1)
+            count += len(values)
+            if odd_file is not None:
+                odd_file.write(mask)
+            if even_file is not None:
+                even_file.write(mask.translate(_FLIP))
+    return count, odd
+
+
+def classify_csv_shard(path, start, end, column, write_odd, write_even):
+    # Worker: -> (count, odd, odd_tmp_path, even_tmp_path)
+    tmps = [tempfile.NamedTemporaryFile(delete=False) if write else None
+            for write in (write_odd, write_even)]
+    try:
+        count, odd = classify_csv(path, tmps[0], tmps[1], column, start, end)
+    finally:
+        for tmp in tmps:
+            if tmp is not None:
+                tmp.close()
+    return (count, odd) + tuple(tmp.name if tmp is not None else None for tmp in tmps)
+
+
+def _classify_csv_sharded(path, files, column, shards):
+    count = odd = 0
+    with ProcessPoolExecutor(max_workers=shards) as pool:
+        futures = [pool.submit(classify_csv_shard, path, start, end, column,
+                               files[0] is not None, files[1] is not None)
+                   for start, end in shard_ranges(os.path.getsize(path), shards)]
+        for fut in futures:
+            n, part, *tmp_paths = fut.result()
+            count += n
+            odd += part
+            for f, tmp_path in zip(files, tmp_paths):
+                if tmp_path is not None:
+                    with open(tmp_path, 'rb') as tmp:
+                        shutil.copyfileobj(tmp, f, CSV_CHUNK_BYTES)
+                    os.unlink(tmp_path)
+    return count, odd
+
+
+def _write_npy(tmp_path, out_path, count):
+    # Wraps a raw uint8 mask file in an .npy header
+    np = _numpy()
+    if np is None:
+        raise ValueError('Writing .npy files requires NumPy')
+    with open(out_path, 'wb') as out, open(tmp_path, 'rb') as tmp:
+        np.lib.format.write_array_header_1_0(
+            out, {'descr': '|u1', 'fortran_order': False, 'shape': (count,)})
+        shutil.copyfileobj(tmp, out, CSV_CHUNK_BYTES)
+
+
+def classify_streamed(path, fmt, odd_path=None, even_path=None, column=0, workers=None):
+    # CSV input (or raw input without NumPy): masks are written sequentially,
+    # through a temporary file when the output is .npy and the count is
+    # not known up front
+    targets = []
+    files = []
+    try:
+        for out_path in (odd_path, even_path):
+            if not out_path:
+                files.append(None)
+                continue
+            if out_path.endswith('.npy'):
+                tmp = tempfile.NamedTemporaryFile(delete=False, dir=os.path.dirname(os.path.abspath(out_path)))
+                targets.append((tmp.name, out_path))
+                files.append(tmp)
+            else:
+                files.append(open(out_path, 'wb'))
+        if fmt == 'csv':
+            shards = shard_count(os.path.getsize(path), workers, MIN_CSV_SHARD_BYTES)
+            if shards > 1:
+                count, odd = _classify_csv_sharded(path, files, column, shards)
+            else:
+                count, odd = classify_csv(path, files[0], files[1], column)
+        else:
+            count, odd = classify_raw_bytes(path, files[0], files[1])
+    finally:
+        for f in files:
+            if f is not None:
+                f.close()
+    try:
+        for tmp_path, out_path in targets:
+            _write_npy(tmp_path, out_path, count)
+    finally:
+        for tmp_path, _ in targets:
+            os.unlink(tmp_path)
+    return count, odd
+
+
+def classify_file(path, odd_path=None, even_path=None, workers=None, fmt=None, column=0):
+    # -> (count, odd) for any supported input
+    fmt = fmt or input_format(path)
+    if fmt == 'csv' or (fmt == 'raw' and _numpy() is None):
+        return classify_streamed(path, fmt, odd_path, even_path, column, workers)
+    return classify_mapped(path, fmt, odd_path, even_path, workers)
+
+
+def _take_option(args, name, default=None):
+    # Removes "--name value" from args and returns value (or default)
+    if name in args:
+        i = args.index(name)
+        if i + 1 >= len(args):
+            print(f'Missing value for {name}', file=sys.stderr)
+            sys.exit(1)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return default
+
+
+def main():
+    args = sys.argv[1:]
+    odd_path = _take_option(args, '--odd')
+    even_path = _take_option(args, '--even')
+    fmt = _take_option(args, '--format')
+    workers = take_workers(args)
+    column = _take_option(args, '--column', '0')
+    try:
+        column = int(column)
+    except ValueError:
+        column = -1
+    if len(args) != 1 or fmt not in (None, 'npy', 'raw', 'csv') or column < 0:
+        print("Usage: bulk_parity.py INPUT [--format npy|raw|csv] [--column N] "
+              "[--odd MASK] [--even MASK] [--workers N]", file=sys.stderr)
+        sys.exit(1)
+    started = time.perf_counter()
+    try:
+        count, odd = classify_file(args[0], odd_path, even_path, workers, fmt, column)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+    print(f"Values: {count}")
+    print(f"Even:   {count - odd}")
+    print(f"Odd:    {odd}")
+    print(throughput_line(count, elapsed, 'values'))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,94 @@
 #!/usr/bin/env python3
 """
 calculator.py
-Simple calculator that reads: <number> <operator> <number>
-Supported operators: +, -, *, /
+Simple calculator that reads an arithmetic expression such as 3 + 4 or
+-(2 + 3) ** 2 % 7
+Supported operators: +, -, *, /, %, ** and unary minus, with parentheses.
+Precedence follows Python: ** binds tightest (right-associative, and tighter
+than a unary minus on its left), then * / %, then + -.
 
 Usage examples:
     Interactive: run without args and type: 3 + 4
     Pipe:        printf '3 + 4\n' | python3 calculator.py
     CLI args:    python3 calculator.py 3 + 4
+                 python3 calculator.py '(1 + 2) * 3'
+    Batch:       python3 calculator.py --batch expressions.txt
+                 printf '3 + 4\n1 / 0\n' | python3 calculator.py --batch
+    Columns:     python3 calculator.py --columns 'a * b' data.csv
+                 python3 calculator.py --columns 'x / 2' values.npy out.npy
 
 The script validates input and handles division by zero.
+
+Batch mode evaluates one expression per line and writes one tab-separated
+"<result>\t<error>" row per input line, in order. A line that fails (bad
+number, bad operator, division by zero) leaves the result column empty and
+the run continues.
+
+Expressions are compiled once into a tree of small closures and kept in an
+LRU cache keyed by the expression text, so a formula that repeats across
+millions of lines is only parsed the first time it is seen.
+
+Column mode applies one expression to whole columns at once. Names in the
+expression refer to columns: the header names of a CSV file, "x" for a 1-D
+.npy array, or c0, c1, ... for the columns of a 2-D .npy array. Values are
+evaluated as float64 with NumPy element-wise operations (a plain row loop is
+used when NumPy is not installed). Rows that divide by zero are reported in
+a per-row mask instead of stopping the run: an empty result plus an error in
+CSV output, or a <name>.mask.npy file next to .npy output.
 """
+import csv
+import operator
+import re
 import sys
+from array import array
+from functools import lru_cache
+
+
+# Buffer size for batch input/output; large enough that millions of short
+# rows turn into a few thousand write() calls.
+BATCH_BUFFER_SIZE = 1 << 20
+
+# Number of distinct compiled expressions kept by compile_expression()
+EXPRESSION_CACHE_SIZE = 4096
+
+# Largest integer result, in bits (about 2466 decimal digits; Python will
+# not print an int past 4300 digits, and larger powers take unbounded time)
+MAX_INT_BITS = 1 << 13
+
+# Deepest nesting of parentheses, unary signs and ** accepted by the parser,
+# and the deepest parse tree; both keep parsing and evaluation well inside
+# the interpreter's recursion limit
+MAX_NESTING = 100
+MAX_TREE_DEPTH = 400
+
+
+def _power(a, b):
+    # operator.pow, refusing integer powers too large to finish in
+    # reasonable time (checked before computing) and non-real results
+    # such as (-8) ** 0.5
+    if type(a) is int and type(b) is int and b > 0 and (abs(a).bit_length() - 1) * b > MAX_INT_BITS:
+        raise OverflowError('Result too large')
+    result = a ** b
+    if type(result) is complex:
+        raise ValueError('Result is not a real number')
+    return result
+
+
+OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+    '**': _power,
+}
+
+# Rows per slice when writing column results as CSV text
+COLUMN_WRITE_CHUNK = 65536
+
+# number | operator or parenthesis | name; anything else is reported as invalid
+_TOKEN_RE = re.compile(
+    r'\s*(?:((?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(\*\*|[-+*/%()])|([A-Za-z_]\w*))')
 
 
 def parse_number(s):
@@ -27,18 +104,329 @@ def parse_number(s):
 
 
 def compute(a, op, b):
+    func = OPERATORS.get(op)
+    if func is None:
+        raise ValueError(f"Unsupported operator: {op}. Supported operators are + - * / % **")
+    return func(a, b)
+
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    end = len(text.rstrip())
+    while pos < end:
+        m = _TOKEN_RE.match(text, pos)
+        if m is None or m.end() == pos:
+            raise ValueError(f"Invalid expression: unexpected {text[pos:].strip()[:1]!r} in {text.strip()!r}")
+        number, op, name = m.groups()
+        if number is not None:
+            tokens.append(('num', parse_number(number)))
+        elif op is not None:
+            tokens.append(('op', op))
+        else:
+            tokens.append(('name', name))
+        pos = m.end()
+    return tokens
+
+
+class _Parser:
+    # Recursive descent over the token list, producing tuples:
+    #   ('num', value) | ('name', name) | ('neg', node) | ('bin', op, left, right)
+
+    def __init__(self, text):
+        self.text = text.strip()
+        self.tokens = tokenize(text)
+        self.pos = 0
+        self.depth = 0
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return None
+
+    def take_op(self, *ops):
+        tok = self.peek()
+        if tok is not None and tok[0] == 'op' and tok[1] in ops:
+            self.pos += 1
+            return tok[1]
+        return None
+
+    def error(self, what):
+        return ValueError(f"Invalid expression: {what} in {self.text!r}")
+
+    def parse(self):
+        if not self.tokens:
+            raise self.error('empty expression')
+        node = self.expr()
+        if self.peek() is not None:
+            raise self.error(f"unexpected {self.peek()[1]!r}")
+        if tree_depth(node) > MAX_TREE_DEPTH:
+            raise self.error('expression too deep')
+        return node
+
+    def expr(self):
+        node = self.term()
+        while True:
+            op = self.take_op('+', '-')
+            if op is None:
+                return node
+            node = ('bin', op, node, self.term())
+
+    def term(self):
+        node = self.unary()
+        while True:
+            op = self.take_op('*', '/', '%')
+            if op is None:
+                return node
+            node = ('bin', op, node, self.unary())
+
+    def unary(self):
+        # Every level of parentheses, sign and ** passes through here
+        self.depth += 1
+        if self.depth > MAX_NESTING:
+            raise self.error('expression nested too deeply')
+        if self.take_op('-'):
+            node = ('neg', self.unary())
+        elif self.take_op('+'):
+            node = self.unary()
+        else:
+            node = self.power()
+        self.depth -= 1
+        return node
+
+    def power(self):
+        node = self.atom()
+        if self.take_op('**'):
+            # right-associative, and the exponent may carry its own sign
+            node = ('bin', '**', node, self.unary())
+        return node
+
+    def atom(self):
+        tok = self.peek()
+        if tok is None:
+            raise self.error('unexpected end of input')
+        if tok[0] in ('num', 'name'):
+            self.pos += 1
+            return tok
+        if self.take_op('('):
+            node = self.expr()
+            if not self.take_op(')'):
+                raise self.error("missing ')'")
+            return node
+        raise self.error(f"unexpected {tok[1]!r}")
+
+
+def tree_depth(node):
+    # Iterative, so it is safe on the long operator chains it guards against
+    depth = 0
+    stack = [(node, 1)]
+    while stack:
+        node, d = stack.pop()
+        depth = max(depth, d)
+        if node[0] == 'neg':
+            stack.append((node[1], d + 1))
+        elif node[0] == 'bin':
+            stack.append((node[2], d + 1))
+            stack.append((node[3], d + 1))
+    return depth
+
+
+def parse_expression(text):
+    return _Parser(text).parse()
+
+
+def expression_names(node):
+    kind = node[0]
+    if kind == 'num':
+        return set()
+    if kind == 'name':
+        return {node[1]}
+    if kind == 'neg':
+        return expression_names(node[1])
+    return expression_names(node[2]) | expression_names(node[3])
+
+
+def _lookup(env, name):
     try:
-        if op == '+':
-            return a + b
-        if op == '-':
-            return a - b
-        if op == '*':
-            return a * b
-        if op == '/':
-            return a / b
-        raise ValueError(f"Unsupported operator: {op}. Supported operators are + - * /")
-    except ZeroDivisionError:
-        raise
+        return env[name]
+    except KeyError:
+        raise ValueError(f"Unknown name: {name}") from None
+
+
+def build_evaluator(node):
+    # Turn a parse tree into nested closures taking the variable mapping;
+    # evaluating the result never looks at the tree or the text again.
+    kind = node[0]
+    if kind == 'num':
+        value = node[1]
+        return lambda env: value
+    if kind == 'name':
+        name = node[1]
+        return lambda env: _lookup(env, name)
+    if kind == 'neg':
+        operand = build_evaluator(node[1])
+        return lambda env: -operand(env)
+    func = OPERATORS[node[1]]
+    left = build_evaluator(node[2])
+    right = build_evaluator(node[3])
+    return lambda env: func(left(env), right(env))
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(text):
+    return build_evaluator(parse_expression(text))
+
+
+def _import_numpy():
+    # Imported lazily so the scalar and batch paths keep their fast startup
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def build_column_evaluator(node, np):
+    # Same shape as build_evaluator(), but every closure works on whole
+    # float64 arrays and records division by zero in the shared `bad` mask
+    # (the rows where compute() would raise ZeroDivisionError).
+    kind = node[0]
+    if kind == 'num':
+        value = float(node[1])
+        return lambda env, bad: value
+    if kind == 'name':
+        name = node[1]
+        return lambda env, bad: _lookup(env, name)
+    if kind == 'neg':
+        operand = build_column_evaluator(node[1], np)
+        return lambda env, bad: np.negative(operand(env, bad))
+    op = node[1]
+    left = build_column_evaluator(node[2], np)
+    right = build_column_evaluator(node[3], np)
+    if op in ('/', '%'):
+        func = np.true_divide if op == '/' else np.remainder
+
+        def divide(env, bad):
+            a = left(env, bad)
+            b = right(env, bad)
+            bad |= (b == 0)
+            return func(a, b)
+        return divide
+    if op == '**':
+        def power(env, bad):
+            a = left(env, bad)
+            b = right(env, bad)
+            bad |= (a == 0) & (b < 0)
+            return np.power(a, b)
+        return power
+    func = OPERATORS[op]
+    return lambda env, bad: func(left(env, bad), right(env, bad))
+
+
+def _column_length(columns):
+    for col in columns.values():
+        return len(col)
+    return 0
+
+
+def evaluate_columns(text, columns):
+    # Returns (results, zero_division_mask) for every row of `columns`, a
+    # mapping of name -> equal-length sequence of numbers. Masked rows hold NaN.
+    node = parse_expression(text)
+    for name in expression_names(node):
+        if name not in columns:
+            raise ValueError(f"Unknown name: {name}")
+    rows = _column_length(columns)
+    np = _import_numpy()
+    if np is None:
+        return _evaluate_columns_loop(text, columns, rows)
+
+    env = {name: np.asarray(col, dtype=np.float64) for name, col in columns.items()}
+    bad = np.zeros(rows, dtype=bool)
+    evaluator = build_column_evaluator(node, np)
+    with np.errstate(all='ignore'):
+        values = evaluator(env, bad)
+    results = np.empty(rows, dtype=np.float64)
+    results[...] = values
+    results[bad] = np.nan
+    return results, bad
+
+
+def _evaluate_columns_loop(text, columns, rows):
+    # Fallback without NumPy: one compiled-closure call per row
+    evaluator = compile_expression(text)
+    names = list(columns)
+    results = array('d', bytes(8 * rows))
+    bad = bytearray(rows)
+    nan = float('nan')
+    for i, values in enumerate(zip(*(columns[n] for n in names)) if names else ((),) * rows):
+        try:
+            results[i] = evaluator(dict(zip(names, values)))
+        except ZeroDivisionError:
+            results[i] = nan
+            bad[i] = 1
+        except (OverflowError, ValueError):
+            # too large, or not real; NumPy gives inf/NaN for these rows
+            results[i] = nan
+    return results, bad
+
+
+def load_csv_columns(path):
+    # Header row gives the column names; every other cell must be a number
+    np = _import_numpy()
+    with open(path, 'r', newline='', buffering=BATCH_BUFFER_SIZE) as f:
+        reader = csv.reader(f)
+        try:
+            header = [h.strip() for h in next(reader)]
+        except StopIteration:
+            raise ValueError(f"{path}: empty CSV file") from None
+        if np is not None:
+            data = np.loadtxt(f, delimiter=',', dtype=np.float64, ndmin=2)
+            if data.size == 0:
+                data = data.reshape(0, len(header))
+            if data.shape[1] != len(header):
+                raise ValueError(f"{path}: expected {len(header)} columns, got {data.shape[1]}")
+            return {name: data[:, i] for i, name in enumerate(header)}
+        cols = [array('d') for _ in header]
+        for lineno, row in enumerate(reader, start=2):
+            if not row:
+                continue
+            if len(row) != len(header):
+                raise ValueError(f"{path}:{lineno}: expected {len(header)} columns, got {len(row)}")
+            for col, cell in zip(cols, row):
+                try:
+                    col.append(float(cell))
+                except ValueError:
+                    raise ValueError(f"{path}:{lineno}: invalid number {cell!r}") from None
+        return dict(zip(header, cols))
+
+
+def load_npy_columns(path):
+    np = _import_numpy()
+    if np is None:
+        raise ValueError('Reading .npy files requires NumPy')
+    data = np.load(path, mmap_mode='r')
+    if data.ndim == 1:
+        return {'x': data}
+    if data.ndim == 2:
+        return {f'c{i}': data[:, i] for i in range(data.shape[1])}
+    raise ValueError(f"{path}: expected a 1-D or 2-D array, got {data.ndim}-D")
+
+
+def write_column_csv(outfile, results, bad):
+    # Same two-column layout as batch mode: "result,error"
+    write = outfile.write
+    write('result,error\n')
+    for start in range(0, len(results), COLUMN_WRITE_CHUNK):
+        end = start + COLUMN_WRITE_CHUNK
+        chunk = results[start:end]
+        values = chunk.tolist()
+        flags = bytes(bad[start:end])
+        if 1 not in flags:
+            write(''.join([f'{v},\n' for v in values]))
+            continue
+        write(''.join([',division by zero\n' if flag else f'{v},\n'
+                       for v, flag in zip(values, flags)]))
 
 
 def read_input_line(prompt='Enter expression (e.g. 3 + 4): '):
@@ -48,50 +436,127 @@ def read_input_line(prompt='Enter expression (e.g. 3 + 4): '):
         return None
 
 
+def evaluate_line(line):
+    # Returns (result, error); exactly one of the two is None. Every
+    # failure is reported as an error so batch runs never stop on a line.
+    try:
+        result = compile_expression(line.strip())({})
+    except ZeroDivisionError:
+        return None, 'Error: division or modulo by zero'
+    except OverflowError:
+        # float overflow gives an errno tuple as its message; one wording
+        # for every too-large result, as _power() raises for ints
+        return None, 'Result too large'
+    except (ValueError, TypeError) as e:
+        return None, str(e)
+    except RecursionError:
+        return None, 'Invalid expression: nested too deeply'
+    if type(result) is int and result.bit_length() > MAX_INT_BITS:
+        return None, 'Result too large'
+    return result, None
+
+
+def run_batch(infile, outfile):
+    # One row per input line so results stay aligned with the input
+    write = outfile.write
+    rows = 0
+    errors = 0
+    for line in infile:
+        result, error = evaluate_line(line)
+        if error is None:
+            write(f'{result}\t\n')
+        else:
+            write(f'\t{error}\n')
+            errors += 1
+        rows += 1
+    return rows, errors
+
+
+def batch_main(args):
+    if args:
+        try:
+            infile = open(args[0], 'r', buffering=BATCH_BUFFER_SIZE)
+        except OSError as e:
+            print(f'Cannot open {args[0]}: {e.strerror}', file=sys.stderr)
+            sys.exit(1)
+    else:
+        infile = sys.stdin
+    outfile = open(sys.stdout.fileno(), 'w', buffering=BATCH_BUFFER_SIZE, closefd=False)
+    try:
+        rows, errors = run_batch(infile, outfile)
+    finally:
+        outfile.flush()
+        if infile is not sys.stdin:
+            infile.close()
+    if errors:
+        print(f'{errors} of {rows} lines failed', file=sys.stderr)
+
+
+def columns_main(args):
+    if len(args) < 2:
+        print('Usage: calculator.py --columns EXPRESSION INPUT.csv|INPUT.npy [OUTPUT.csv|OUTPUT.npy]',
+              file=sys.stderr)
+        sys.exit(1)
+    text, in_path = args[0], args[1]
+    out_path = args[2] if len(args) >= 3 else None
+    try:
+        if in_path.endswith('.npy'):
+            columns = load_npy_columns(in_path)
+        else:
+            columns = load_csv_columns(in_path)
+        results, bad = evaluate_columns(text, columns)
+    except OSError as e:
+        print(f'Cannot open {in_path}: {e.strerror}', file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    if out_path is not None and out_path.endswith('.npy'):
+        np = _import_numpy()
+        if np is None:
+            print('Writing .npy files requires NumPy', file=sys.stderr)
+            sys.exit(1)
+        np.save(out_path, np.asarray(results))
+        np.save(out_path[:-len('.npy')] + '.mask.npy', np.asarray(bad, dtype=bool))
+    elif out_path is not None:
+        with open(out_path, 'w', buffering=BATCH_BUFFER_SIZE) as outfile:
+            write_column_csv(outfile, results, bad)
+    else:
+        outfile = open(sys.stdout.fileno(), 'w', buffering=BATCH_BUFFER_SIZE, closefd=False)
+        write_column_csv(outfile, results, bad)
+        outfile.flush()
+
+    errors = bytes(bad).count(1)
+    if errors:
+        print(f'{errors} of {len(results)} rows divided by zero', file=sys.stderr)
+
+
 def main():
-    tokens = None
+    if len(sys.argv) >= 2 and sys.argv[1] == '--batch':
+        batch_main(sys.argv[2:])
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == '--columns':
+        columns_main(sys.argv[2:])
+        return
+
     # CLI args: calculator.py 3 + 4
-    if len(sys.argv) >= 4:
-        tokens = sys.argv[1:4]
+    if len(sys.argv) >= 2:
+        line = ' '.join(sys.argv[1:])
     else:
         # Try reading a line (either piped or interactive)
         line = read_input_line()
         if line is None:
             print('No input received. Exiting.', file=sys.stderr)
             sys.exit(1)
-        line = line.strip()
-        # Split respecting '**'
-        # naive split on spaces
-        parts = line.split()
-        if len(parts) >= 3:
-            # join operators if user typed '**'
-            if parts[1] == '*' and len(parts) >= 4 and parts[2] == '*':
-                tokens = [parts[0], '**', parts[3]]
-            else:
-                tokens = parts[0:3]
-        else:
-            print('Please enter an expression with two operands and an operator, e.g. 3 + 4')
+        if line.strip() == '':
+            print('Please enter an expression, e.g. 3 + 4')
             sys.exit(1)
 
-    a_s, op, b_s = tokens
-    a = parse_number(a_s)
-    b = parse_number(b_s)
-    if a is None:
-        print(f'Invalid number: {a_s}', file=sys.stderr)
+    result, error = evaluate_line(line)
+    if error is not None:
+        print(error, file=sys.stderr)
         sys.exit(1)
-    if b is None:
-        print(f'Invalid number: {b_s}', file=sys.stderr)
-        sys.exit(1)
-
-    try:
-        result = compute(a, op, b)
-    except ZeroDivisionError:
-        print('Error: division or modulo by zero', file=sys.stderr)
-        sys.exit(1)
-    except ValueError as e:
-        print(e, file=sys.stderr)
-        sys.exit(1)
-
     print(result)
 
 
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+calculator_server.py
+Keeps one warm calculator process on a local socket so shell callers do not
+pay an interpreter start per expression.
+
+Protocol (newline-delimited, UTF-8):
+  request:  one expression per line, e.g. 3 + 4
+  response: one line per request, in the same order:
+              ok <result>
+              err <message>
+Clients may pipeline: send many lines without waiting, then read the same
+number of response lines back.
+
+Usage:
+  Server:  python3 calculator_server.py serve                 # 127.0.0.1:8765
+           python3 calculator_server.py serve --port 9000
+           python3 calculator_server.py serve --unix /tmp/calc.sock
+  Client:  python3 calculator_server.py client 3 + 4
+           printf '3 + 4\n1 / 0\n' | python3 calculator_server.py client
+  Bench:   python3 calculator_server.py bench --requests 100000 --connections 8 --pipeline 16
+
+The same --host/--port/--unix options select the address for every command.
+Expressions are evaluated with calculator.evaluate_line(), so the results and
+error messages match calculator.py --batch. Every request gets exactly one
+reply: a line that cannot be evaluated, takes longer than EVAL_TIMEOUT or is
+longer than MAX_REQUEST_BYTES is answered with an err line and the
+connection carries on.
+"""
+import asyncio
+import itertools
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from calculator import evaluate_line
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Wait for the socket to drain once this many response bytes are queued
+WRITE_HIGH_WATER = 1 << 16
+
+# Longest request line accepted, newline included
+MAX_REQUEST_BYTES = 1 << 16
+
+# Requests longer than this are evaluated on EVAL_POOL instead of the event
+# loop, and answered with an error if they take more than EVAL_TIMEOUT
+# seconds. (A thread cannot be stopped, so a timed-out evaluation still
+# finishes in the background; the power and depth limits in calculator.py
+# keep that bounded.)
+INLINE_MAX_BYTES = 1024
+EVAL_TIMEOUT = 5.0
+EVAL_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='calc-eval')
+
+TOO_LONG = object()
+
+
+def format_response(line):
+    try:
+        result, error = evaluate_line(line)
+    except Exception as e:  # never let one request take the connection down
+        error = f'Error: {type(e).__name__}: {e}'
+    if error is None:
+        return f'ok {result}\n'.encode()
+    return f'err {error}\n'.encode()
+
+
+async def read_request(reader):
+    # One request line; b'' at EOF, TOO_LONG for a line over the limit
+    # (which is read through its newline and dropped)
+    try:
+        return await reader.readuntil(b'\n')
+    except asyncio.IncompleteReadError as e:
+        return e.partial    # last line without a newline, or b'' at EOF
+    except asyncio.LimitOverrunError as e:
+        overrun = e
+    while True:
+        await reader.readexactly(overrun.consumed)
+        try:
+            await reader.readuntil(b'\n')
+            return TOO_LONG
+        except asyncio.IncompleteReadError:
+            return TOO_LONG
+        except asyncio.LimitOverrunError as e:
+            overrun = e
+
+
+async def evaluate_request(line):
+    text = line.decode('utf-8', 'replace')
+    if len(line) <= INLINE_MAX_BYTES:
+        return format_response(text)
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(EVAL_POOL, format_response, text), EVAL_TIMEOUT)
+    except asyncio.TimeoutError:
+        return f'err Error: evaluation timed out after {EVAL_TIMEOUT:g} s\n'.encode()
+
+
+async def handle_client(reader, writer):
+    try:
+        while True:
+            line = await read_request(reader)
+            if not line:
+                break
+            if line is TOO_LONG:
+                reply = f'err Error: request longer than {MAX_REQUEST_BYTES} bytes\n'.encode()
+            else:
+                # Short pipelined requests are already buffered, so this
+                # loop answers them back to back on the event loop.
+                reply = await evaluate_request(line)
+            writer.write(reply)
+            if writer.transport.get_write_buffer_size() > WRITE_HIGH_WATER:
+                await writer.drain()
+        await writer.drain()
+    except (ConnectionResetError, BrokenPipeError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+    if unix_path is not None:
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        server = await asyncio.start_unix_server(handle_client, path=unix_path,
+                                                 limit=MAX_REQUEST_BYTES)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(handle_client, host, port, limit=MAX_REQUEST_BYTES)
+        where = f'{host}:{port}'
+    print(f'Calculator server listening on {where}', file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def connect(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+    if unix_path is not None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(unix_path)
+    else:
+        sock = socket.create_connection((host, port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+class CalculatorClient:
+    # Small blocking client. Requests are pipelined in windows of `window`
+    # lines, and each window's replies are read before the next is sent, so
+    # neither side can stall with both socket buffers full.
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, window=1024):
+        self.sock = connect(host, port, unix_path)
+        self.rfile = self.sock.makefile('rb')
+        self.window = window
+
+    def iter_evaluate(self, expressions):
+        # Yields (result_text, error) pairs in request order; `expressions`
+        # may be any iterable, including a file being read
+        expressions = iter(expressions)
+        while True:
+            batch = list(itertools.islice(expressions, self.window))
+            if not batch:
+                return
+            payload = ''.join(e.replace('\n', ' ') + '\n' for e in batch)
+            self.sock.sendall(payload.encode())
+            for _ in batch:
+                line = self.rfile.readline()
+                if not line:
+                    raise ConnectionError('Server closed the connection')
+                status, _, text = line.decode().rstrip('\n').partition(' ')
+                if status == 'ok':
+                    yield text, None
+                else:
+                    yield None, text
+
+    def evaluate_many(self, expressions):
+        # Returns a list of (result_text, error) pairs in request order
+        return list(self.iter_evaluate(expressions))
+
+    def evaluate(self, expression):
+        return self.evaluate_many([expression])[0]
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+async def _bench_connection(host, port, unix_path, count, pipeline, latencies):
+    if unix_path is not None:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    exprs = [f'{i} * 3 + {i % 7}\n'.encode() for i in range(pipeline)]
+    done = 0
+    clock = time.perf_counter
+    while done < count:
+        n = min(pipeline, count - done)
+        sent = clock()
+        writer.write(b''.join(exprs[:n]))
+        for _ in range(n):
+            line = await reader.readline()
+            if not line.startswith(b'ok '):
+                raise RuntimeError(f'Unexpected reply: {line!r}')
+            latencies.append(clock() - sent)
+        done += n
+    writer.close()
+    await writer.wait_closed()
+
+
+async def bench(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None,
+                requests=100000, connections=8, pipeline=16):
+    latencies = []
+    per_conn = [requests // connections] * connections
+    for i in range(requests % connections):
+        per_conn[i] += 1
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _bench_connection(host, port, unix_path, n, pipeline, latencies)
+        for n in per_conn if n
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'rps': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000.0,
+        'p99_ms': percentile(latencies, 99) * 1000.0,
+    }
+
+
+def _take_option(args, name, default=None):
+    # Removes "--name value" from args and returns value (or default)
+    if name in args:
+        i = args.index(name)
+        if i + 1 >= len(args):
+            print(f'Missing value for {name}', file=sys.stderr)
+            sys.exit(1)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return default
+
+
+def _take_int_option(args, name, default):
+    value = _take_option(args, name)
+    if value is None:
+        return default
+    try:
+        n = int(value)
+    except ValueError:
+        n = 0
+    if n <= 0:
+        print(f'{name} must be a positive integer', file=sys.stderr)
+        sys.exit(1)
+    return n
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in ('serve', 'client', 'bench'):
+        print('Usage: calculator_server.py serve|client|bench [--host H] [--port P] [--unix PATH]',
+              file=sys.stderr)
+        sys.exit(1)
+    command = args.pop(0)
+    host = _take_option(args, '--host', DEFAULT_HOST)
+    port = _take_int_option(args, '--port', DEFAULT_PORT)
+    unix_path = _take_option(args, '--unix')
+
+    if command == 'serve':
+        try:
+            asyncio.run(serve(host, port, unix_path))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if command == 'bench':
+        requests = _take_int_option(args, '--requests', 100000)
+        connections = _take_int_option(args, '--connections', 8)
+        pipeline = _take_int_option(args, '--pipeline', 16)
+        try:
+            stats = asyncio.run(bench(host, port, unix_path, requests, connections, pipeline))
+        except OSError as e:
+            print(f'Cannot connect to server: {e.strerror or e}', file=sys.stderr)
+            sys.exit(1)
+        print(f"Requests:   {stats['requests']}")
+        print(f"Elapsed:    {stats['seconds']:.3f} s")
+        print(f"Throughput: {stats['rps']:.0f} req/s")
+        print(f"Latency:    p50={stats['p50_ms']:.3f} ms  p99={stats['p99_ms']:.3f} ms")
+        return
+
+    # client: expression from argv, otherwise one expression per stdin line
+    if args:
+        expressions = [' '.join(args)]
+    else:
+        expressions = (line.rstrip('\n') for line in sys.stdin)
+    try:
+        client = CalculatorClient(host, port, unix_path)
+    except OSError as e:
+        print(f'Cannot connect to server: {e.strerror or e}', file=sys.stderr)
+        sys.exit(1)
+    failed = False
+    try:
+        for result, error in client.iter_evaluate(expressions):
+            if error is None:
+                print(result)
+            else:
+                print(error, file=sys.stderr)
+                failed = True
+    finally:
+        client.close()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -20,9 +20,13 @@ Examples:
 
   Command-line:
     python3 feet_converter.py 5280
+
+The conversion factors live in unit_conversion.py.
 """
 import sys
 
+from unit_conversion import convert
+
 
 def parse_number(s):
     try:
@@ -60,17 +64,11 @@ def main():
             print("Please enter a valid number for feet (integer or decimal).")
             feet = read_feet()
 
-    # Conversion constants
-    FEET_PER_YARD = 3.0
-    FEET_PER_MILE = 5280.0
-    FEET_PER_LEAGUE = FEET_PER_MILE * 3.0  # 3 miles per league
-    METERS_PER_FOOT = 0.3048
-
-    yards = feet / FEET_PER_YARD
-    miles = feet / FEET_PER_MILE
-    inches = feet * 12.0
-    leagues = feet / FEET_PER_LEAGUE
-    meters = feet * METERS_PER_FOOT
+    yards = convert(feet, 'ft', 'yd')
+    miles = convert(feet, 'ft', 'mi')
+    inches = convert(feet, 'ft', 'in')
+    leagues = convert(feet, 'ft', 'league')
+    meters = convert(feet, 'ft', 'm')
 
     print()
     print(f"Input: {feet} ft")
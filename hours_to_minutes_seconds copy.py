@@ -14,9 +14,42 @@ Examples:
 
   Command-line args:
     python3 hours_to_minutes_seconds.py 2
+
+The conversion factors live in unit_conversion.py.
+
+Stream mode (log files, one duration per line, constant memory):
+  python3 hours_to_minutes_seconds.py --stream durations.log
+  python3 hours_to_minutes_seconds.py --stream jobs.csv --key-column 1 --value-column 3
+  cat durations.log | python3 hours_to_minutes_seconds.py --stream - --totals-only
+
+Durations may be decimal hours (2.5), clock form (02:30:00 or 2:30, minutes
+and seconds below 60) or unit form (2h30m, 45m, 1h5m30s, 1.5h). With
+--key-column the line is split on --sep (default ",") and columns are numbered
+from 1; the duration column defaults to the first column that is not the key.
+Each row is written as "[key,]minutes,seconds,running_total_seconds"; the
+overall total and the per-key sums follow at the end (on stderr when rows go
+to stdout). Lines that do not parse are counted and skipped. Only the per-key
+sums grow with the input, by one entry per distinct key.
 """
+import re
 import sys
 
+from unit_conversion import conversion_factors, convert
+
+
+# Bytes of input handed to readlines() per chunk in stream mode
+STREAM_CHUNK_SIZE = 1 << 20
+
+SECONDS_PER_HOUR = conversion_factors('h', 's')[0]
+SECONDS_PER_MINUTE = conversion_factors('min', 's')[0]
+
+_NUM = r'\d+(?:\.\d*)?|\.\d+'
+_DURATION_RE = re.compile(rf"""\s*(?:
+    (?P<hours>{_NUM})                                          # 2.5
+  | (?P<ch>\d+):(?P<cm>[0-5]?\d)(?::(?P<cs>[0-5]?\d(?:\.\d*)?))?   # 02:30[:00]
+  | (?=[\d.])(?:(?P<uh>{_NUM})h)?\s*(?:(?P<um>{_NUM})m)?\s*(?:(?P<us>{_NUM})s)?  # 2h30m
+)\s*""", re.VERBOSE)
+
 
 def parse_number(s):
     try:
@@ -25,6 +58,136 @@ def parse_number(s):
         return None
 
 
+def parse_duration(s):
+    # Duration in seconds, or None if s is not one of the accepted forms
+    m = _DURATION_RE.fullmatch(s)
+    if m is None:
+        return None
+    hours, ch, cm, cs, uh, um, us = m.groups()
+    if hours is not None:
+        return float(hours) * SECONDS_PER_HOUR
+    if ch is not None:
+        return (int(ch) * SECONDS_PER_HOUR + int(cm) * SECONDS_PER_MINUTE
+                + (float(cs) if cs else 0.0))
+    if uh is None and um is None and us is None:
+        return None
+    return ((float(uh) * SECONDS_PER_HOUR if uh else 0.0)
+            + (float(um) * SECONDS_PER_MINUTE if um else 0.0)
+            + (float(us) if us else 0.0))
+
+
+def stream_durations(infile, outfile, key_col=None, value_col=None, sep=',',
+                     chunk_size=STREAM_CHUNK_SIZE):
+    # key_col/value_col are 0-based (value_col None = the whole line);
+    # outfile may be None for totals only
+    totals = {'lines': 0, 'invalid': 0, 'seconds': 0.0, 'by_key': {}}
+    by_key = totals['by_key']
+    running = 0.0
+    parsed = invalid = 0
+    per_minute = SECONDS_PER_MINUTE
+    while True:
+        lines = infile.readlines(chunk_size)
+        if not lines:
+            break
+        out = []
+        append = out.append
+        for line in lines:
+            key = None
+            if value_col is None:
+                text = line
+            else:
+                fields = line.rstrip('\r\n').split(sep)
+                try:
+                    if key_col is not None:
+                        key = fields[key_col].strip()
+                    text = fields[value_col]
+                except IndexError:
+                    if line.strip():
+                        invalid += 1
+                    continue
+            seconds = parse_duration(text)
+            if seconds is None:
+                if line.strip():
+                    invalid += 1
+                continue
+            parsed += 1
+            running += seconds
+            if key is None:
+                append(f"{seconds / per_minute:.2f},{seconds:.2f},{running:.2f}\n")
+            else:
+                by_key[key] = by_key.get(key, 0.0) + seconds
+                append(f"{key},{seconds / per_minute:.2f},{seconds:.2f},{running:.2f}\n")
+        if outfile is not None:
+            outfile.write(''.join(out))
+    totals['lines'] = parsed
+    totals['invalid'] = invalid
+    totals['seconds'] = running
+    return totals
+
+
+def print_duration_totals(totals, file):
+    seconds = totals['seconds']
+    print(f"Durations: {totals['lines']}", file=file)
+    if totals['invalid']:
+        print(f"Invalid lines skipped: {totals['invalid']}", file=file)
+    print(f"Total: {convert(seconds, 's', 'h'):.2f} h = "
+          f"{convert(seconds, 's', 'min'):.2f} min = {seconds:.2f} s", file=file)
+    if totals['by_key']:
+        print("Per key (seconds):", file=file)
+        for key in sorted(totals['by_key']):
+            print(f"  {key}: {totals['by_key'][key]:.2f}", file=file)
+
+
+def _column_option(args, name):
+    if name not in args:
+        return None
+    i = args.index(name)
+    try:
+        col = int(args[i + 1])
+    except (IndexError, ValueError):
+        col = 0
+    if col <= 0:
+        print(f"{name} must be a positive column number", file=sys.stderr)
+        sys.exit(1)
+    del args[i:i + 2]
+    return col - 1
+
+
+def stream_main(args):
+    totals_only = '--totals-only' in args
+    if totals_only:
+        args.remove('--totals-only')
+    sep = ','
+    if '--sep' in args:
+        i = args.index('--sep')
+        if i + 1 >= len(args):
+            print("Missing value for --sep", file=sys.stderr)
+            sys.exit(1)
+        sep = args[i + 1]
+        del args[i:i + 2]
+    key_col = _column_option(args, '--key-column')
+    value_col = _column_option(args, '--value-column')
+    if value_col is None and key_col is not None:
+        value_col = 1 if key_col == 0 else 0
+    in_path = args[0] if args else '-'
+    try:
+        infile = sys.stdin if in_path == '-' else open(in_path, 'r', buffering=STREAM_CHUNK_SIZE)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    outfile = None
+    if not totals_only:
+        outfile = open(sys.stdout.fileno(), 'w', buffering=STREAM_CHUNK_SIZE, closefd=False)
+    try:
+        totals = stream_durations(infile, outfile, key_col, value_col, sep)
+    finally:
+        if outfile is not None:
+            outfile.flush()
+        if infile is not sys.stdin:
+            infile.close()
+    print_duration_totals(totals, sys.stdout if totals_only else sys.stderr)
+
+
 def read_hours(prompt_text="Enter hours: "):
     try:
         s = input(prompt_text)
@@ -41,6 +204,10 @@ def read_hours(prompt_text="Enter hours: "):
 
 
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--stream':
+        stream_main(sys.argv[2:])
+        return
+
     # Allow passing hours as a single command-line argument
     hours = None
     if len(sys.argv) >= 2:
@@ -55,8 +222,8 @@ def main():
             print("Please enter a valid number for hours (can be integer or decimal).")
             hours = read_hours()
 
-    minutes = hours * 60.0
-    seconds = hours * 3600.0
+    minutes = convert(hours, 'h', 'min')
+    seconds = convert(hours, 'h', 's')
 
     print()
     print(f"Input: {hours} hour(s)")
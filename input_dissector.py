@@ -15,8 +15,63 @@ Assumptions:
 - "only numbers" means only decimal digits (no sign, no decimal point).
 - "capitalized" means the string equals s.capitalize() and first char is uppercase.
 - Title case uses str.istitle() (each word capitalized).
+
+Bulk mode classifies every line of a file (or stdin) with the same checks:
+  python3 input_dissector.py --lines column_dump.txt [--workers 8] [--summary-only]
+  cat column_dump.txt | python3 input_dissector.py --lines -
+
+Each output line is an 8-character string of 0/1 flags in CATEGORIES order
+(only_whitespace, only_numbers, only_alpha, alphanumeric, all_upper,
+all_lower, capitalized, title_case) for the input line without its line
+ending. Per-category totals and the throughput in lines/sec follow on stderr
+(stdout with --summary-only). Files of at least MIN_SHARD_SIZE bytes are
+split at line boundaries (line_shards.py) and classified in a process pool;
+each worker writes its rows to a temporary file and the parent copies them
+out in order.
+
+Bulk mode classifies with classify_mask(), which returns the eight flags as
+one byte (bit i = CATEGORIES[i]) and skips the checks an earlier answer
+already decides. --masks OUT
+also writes that byte per line to OUT, a flat uint8 column that
+load_masks() maps back in without reading it into memory:
+  python3 input_dissector.py --lines column_dump.txt --summary-only --masks dump.u8
+  python3 input_dissector.py --masks-summary dump.u8
+  python3 input_dissector.py --bench [N]     # classify_mask() vs analyze()
 """
+import mmap
+import os
+import shutil
 import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from line_shards import (iter_line_chunks, open_shard, shard_count, shard_ranges,
+                         take_workers, throughput_line)
+
+
+CATEGORIES = (
+    'only_whitespace',
+    'only_numbers',
+    'only_alpha',
+    'alphanumeric',
+    'all_upper',
+    'all_lower',
+    'capitalized',
+    'title_case',
+)
+
+# Bit for each category in a classify_mask() result
+FLAGS = {name: 1 << i for i, name in enumerate(CATEGORIES)}
+
+# Bytes of input handed to readlines() per chunk in bulk mode
+LINES_CHUNK_SIZE = 1 << 20
+
+# Files smaller than this are classified in-process
+MIN_SHARD_SIZE = 16 << 20
 
 
 def get_input():
@@ -31,45 +86,314 @@ def get_input():
         return ''
 
 
-def analyze(s):
-    # We'll keep the original string
-    original = s
+def check_values(original):
+    # The eight checks, in CATEGORIES order.
     # For many checks we consider the raw string (including spaces).
     # Some checks require presence of at least one character of relevant type.
 
-    results = {}
-    results['original'] = original
-
     # Only whitespace: non-empty and all whitespace
-    results['only_whitespace'] = (len(original) > 0 and original.strip() == '')
+    only_whitespace = (len(original) > 0 and original.strip() == '')
 
     # Only numbers: all characters are digits (0-9)
-    results['only_numbers'] = original.isdigit()
+    only_numbers = original.isdigit()
 
     # Alphabetical only: letters only (no spaces)
-    results['only_alpha'] = original.isalpha()
+    only_alpha = original.isalpha()
 
     # Alphanumeric: letters or digits only
-    results['alphanumeric'] = original.isalnum()
+    alphanumeric = original.isalnum()
 
     # All upper / lower: these methods return False if there are no cased characters
-    results['all_upper'] = original.isupper()
-    results['all_lower'] = original.islower()
+    all_upper = original.isupper()
+    all_lower = original.islower()
 
     # Capitalized: first char uppercase and the rest lowercase -> use capitalize()
     # Note: s.capitalize() lowercases the rest of the string, so 'HELLO' -> 'Hello' (not equal)
     # We'll require that the string equals s.capitalize() and that first char is alpha and uppercase
     if len(original) >= 1 and original[0].isalpha():
-        results['capitalized'] = (original == original.capitalize())
+        capitalized = (original == original.capitalize())
     else:
-        results['capitalized'] = False
+        capitalized = False
 
     # Title case: each word capitalized -> use istitle()
-    results['title_case'] = original.istitle()
+    title_case = original.istitle()
 
+    return (only_whitespace, only_numbers, only_alpha, alphanumeric,
+            all_upper, all_lower, capitalized, title_case)
+
+
+def analyze(s):
+    # We'll keep the original string
+    results = {}
+    results['original'] = s
+    results.update(zip(CATEGORIES, check_values(s)))
     return results
 
 
+def classify_mask(s):
+    # check_values() as one small int (bit i = CATEGORIES[i], see FLAGS).
+    # Each flag is decided at most once, and flags implied by an earlier
+    # answer are not tested at all: digit and alpha strings are subsets of
+    # alphanumeric ones, a whitespace string is never alphanumeric and has
+    # no other flag, digits are uncased, and upper/lower exclude each other.
+    if s.isalnum():
+        if s.isdigit():
+            return 10       # only_numbers | alphanumeric
+        mask = 12 if s.isalpha() else 8
+    elif s.isspace():
+        return 1            # only_whitespace
+    else:
+        mask = 0
+    if s.isupper():
+        mask |= 16
+    elif s.islower():
+        mask |= 32
+    if s[:1].isalpha() and s == s.capitalize():
+        mask |= 64
+    if s.istitle():
+        mask |= 128
+    return mask
+
+
+def mask_values(mask):
+    # classify_mask() result -> the check_values() tuple
+    return tuple(bool(mask >> i & 1) for i in range(len(CATEGORIES)))
+
+
+def classify_masks(strings):
+    # Packed column: one classify_mask() byte per string
+    return array('B', map(classify_mask, strings))
+
+
+def save_masks(path, masks):
+    with open(path, 'wb') as f:
+        masks.tofile(f)
+
+
+def load_masks(path):
+    # Read-only memoryview of a saved column, backed by mmap (an empty
+    # file cannot be mapped, so it comes back as an empty view)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(b'')
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def add_mask_totals(totals, mask_counts):
+    # mask_counts: {mask: number of lines}; totals updated in place
+    for mask, n in mask_counts.items():
+        for i in range(len(totals)):
+            if mask >> i & 1:
+                totals[i] += n
+
+
+def mask_totals(masks, chunk_size=LINES_CHUNK_SIZE):
+    # Per-category counts for a packed column, a chunk at a time
+    totals = [0] * len(CATEGORIES)
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    for start in range(0, len(masks), chunk_size):
+        chunk = masks[start:start + chunk_size]
+        if np is not None:
+            hist = np.bincount(np.frombuffer(chunk, dtype=np.uint8), minlength=256)
+            counts = {m: int(n) for m, n in enumerate(hist) if n}
+        else:
+            counts = Counter(chunk)
+        add_mask_totals(totals, counts)
+    return totals
+
+
+def _strip_eol(line):
+    if line.endswith(b'\n'):
+        line = line[:-2] if line.endswith(b'\r\n') else line[:-1]
+    return line
+
+
+# mask -> its output row in bulk mode
+_ROWS = [''.join('1' if m >> i & 1 else '0' for i in range(len(CATEGORIES))).encode() + b'\n'
+         for m in range(256)]
+
+
+def classify_lines(lines, totals):
+    # bytes lines -> array('B') of masks; totals is a list of per-category
+    # counts updated in place. Column dumps repeat values a lot, so each
+    # distinct line in the chunk is classified once.
+    out = []
+    append = out.append
+    memo = {}
+    for line in lines:
+        mask = memo.get(line)
+        if mask is None:
+            mask = memo[line] = classify_mask(_strip_eol(line).decode('utf-8', 'replace'))
+        append(mask)
+    add_mask_totals(totals, Counter(out))
+    return array('B', out)
+
+
+def classify_stream(infile, outfile, chunk_size=LINES_CHUNK_SIZE, end=None, maskfile=None):
+    # infile is binary; stops at byte offset `end` (line starts) when given.
+    # Rows go to outfile and packed masks to maskfile, either may be None.
+    totals = [0] * len(CATEGORIES)
+    count = 0
+    for lines in iter_line_chunks(infile, chunk_size, end):
+        count += len(lines)
+        masks = classify_lines(lines, totals)
+        if outfile is not None:
+            outfile.write(b''.join(map(_ROWS.__getitem__, masks)))
+        if maskfile is not None:
+            masks.tofile(maskfile)
+    return count, totals
+
+
+def classify_shard(path, start, end, write_rows, write_masks=False):
+    out = tempfile.NamedTemporaryFile(delete=False) if write_rows else None
+    mask_out = tempfile.NamedTemporaryFile(delete=False) if write_masks else None
+    with open_shard(path, start) as f:
+        count, totals = classify_stream(f, out, end=end, maskfile=mask_out)
+    names = []
+    for tmp in (out, mask_out):
+        if tmp is not None:
+            tmp.close()
+            names.append(tmp.name)
+        else:
+            names.append(None)
+    return (count, totals) + tuple(names)
+
+
+def _append_file(tmp_path, outfile):
+    with open(tmp_path, 'rb') as tmp:
+        shutil.copyfileobj(tmp, outfile, LINES_CHUNK_SIZE)
+    os.unlink(tmp_path)
+
+
+def classify_file(path, outfile, workers=None, maskfile=None):
+    size = os.path.getsize(path)
+    shards = shard_count(size, workers, MIN_SHARD_SIZE)
+    if shards <= 1:
+        with open(path, 'rb', buffering=LINES_CHUNK_SIZE) as f:
+            return classify_stream(f, outfile, maskfile=maskfile)
+    count = 0
+    totals = [0] * len(CATEGORIES)
+    with ProcessPoolExecutor(max_workers=shards) as pool:
+        futures = [pool.submit(classify_shard, path, start, end,
+                               outfile is not None, maskfile is not None)
+                   for start, end in shard_ranges(size, shards)]
+        for fut in futures:
+            n, part, rows_path, masks_path = fut.result()
+            count += n
+            totals = [a + b for a, b in zip(totals, part)]
+            if rows_path is not None:
+                _append_file(rows_path, outfile)
+            if masks_path is not None:
+                _append_file(masks_path, maskfile)
+    return count, totals
+
+
+def print_line_totals(count, totals, elapsed, file):
+    print(f"Lines: {count}", file=file)
+    for name, n in zip(CATEGORIES, totals):
+        print(f"{name:16}: {n}", file=file)
+    print(throughput_line(count, elapsed), file=file)
+
+
+def lines_main(args):
+    workers = take_workers(args)
+    mask_path = None
+    if '--masks' in args:
+        i = args.index('--masks')
+        if i + 1 >= len(args):
+            print("Missing value for --masks", file=sys.stderr)
+            sys.exit(1)
+        mask_path = args[i + 1]
+        del args[i:i + 2]
+    summary_only = '--summary-only' in args
+    if summary_only:
+        args.remove('--summary-only')
+    path = args[0] if args else '-'
+    outfile = maskfile = None
+    if not summary_only:
+        outfile = open(sys.stdout.fileno(), 'wb', buffering=LINES_CHUNK_SIZE, closefd=False)
+    started = time.perf_counter()
+    try:
+        if mask_path is not None:
+            maskfile = open(mask_path, 'wb')
+        if path == '-':
+            count, totals = classify_stream(sys.stdin.buffer, outfile, maskfile=maskfile)
+        else:
+            count, totals = classify_file(path, outfile, workers, maskfile)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if outfile is not None:
+            outfile.flush()
+        if maskfile is not None:
+            maskfile.close()
+    elapsed = time.perf_counter() - started
+    print_line_totals(count, totals, elapsed, sys.stdout if summary_only else sys.stderr)
+
+
+def masks_summary_main(args):
+    if len(args) != 1:
+        print("Usage: input_dissector.py --masks-summary MASKS", file=sys.stderr)
+        sys.exit(1)
+    started = time.perf_counter()
+    try:
+        masks = load_masks(args[0])
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    totals = mask_totals(masks)
+    print_line_totals(len(masks), totals, time.perf_counter() - started, sys.stdout)
+
+
+def _bench_strings(n):
+    # Short column-like values covering every category
+    shapes = ('{}', 'Word{}', 'WORD', 'word', 'Hello World', 'hello world {}',
+              'ALPHA', 'beta', 'Gamma', '   ', 'x{}y', 'Mixed Case', 'ÉCOLE', 'ǅemal')
+    return [shapes[i % len(shapes)].format(i) for i in range(n)]
+
+
+def bench_main(args):
+    try:
+        n = int(args[0]) if args else 1_000_000
+    except ValueError:
+        n = 0
+    if n <= 0:
+        print("Usage: input_dissector.py --bench [N]", file=sys.stderr)
+        sys.exit(1)
+    strings = _bench_strings(n)
+    clock = time.perf_counter
+
+    started = clock()
+    dicts = [analyze(s) for s in strings]
+    dict_time = clock() - started
+    started = clock()
+    masks = classify_masks(strings)
+    mask_time = clock() - started
+
+    mismatches = sum(1 for d, m in zip(dicts, masks)
+                     if tuple(d[name] for name in CATEGORIES) != mask_values(m))
+    del dicts
+    tracemalloc.start()
+    dicts = [analyze(s) for s in strings]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del dicts
+
+    print(f"Strings:         {n}")
+    print(f"analyze():       {n / dict_time / 1e6:.2f} M/sec ({dict_time:.2f} s), "
+          f"{dict_bytes / n:.0f} bytes/result")
+    print(f"classify_mask(): {n / mask_time / 1e6:.2f} M/sec ({mask_time:.2f} s), "
+          f"{masks.itemsize} byte/result")
+    print(f"Speedup:         {dict_time / mask_time:.2f}x")
+    print(f"Mismatches:      {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
 def pretty_print(res):
     s = res['original']
     print('\nInput dissector results:')
@@ -86,6 +410,16 @@ def pretty_print(res):
 
 
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--lines':
+        lines_main(sys.argv[2:])
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == '--masks-summary':
+        masks_summary_main(sys.argv[2:])
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == '--bench':
+        bench_main(sys.argv[2:])
+        return
+
     s = get_input()
     res = analyze(s)
     pretty_print(res)
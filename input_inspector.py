@@ -5,11 +5,132 @@ Read a single input string (CLI arg, piped, or interactive) and print a detailed
 analysis: length, counts (letters, digits, whitespace, punctuation), word count,
 unique characters, frequency table, per-character codepoints and Unicode names,
 numeric detection (int/float), ASCII check, byte lengths, palindrome check, etc.
+
+File mode inspects a file (or stdin with "-") of any size in constant memory:
+  python3 input_inspector.py --file big.log
+
+The file is read in fixed-size binary chunks and decoded incrementally, so
+multibyte UTF-8 characters and words split across chunks are handled. Counts,
+frequencies, word count, leading/trailing whitespace and byte length are
+exact. Inputs up to KEEP_TEXT_LIMIT characters are kept and analyzed in full;
+for larger ones only a preview is kept, so the words list, numeric detection
+and palindrome checks are skipped.
+
+Large files are split into byte-range shards (moved forward to the next UTF-8
+character start) and inspected in a process pool:
+  python3 input_inspector.py --file big.log --workers 32
+
+Each worker returns a partial InspectionState and the partials are merged in
+file order. The merge is exact: a word cut by a shard edge is counted once,
+and whitespace runs at the edges carry over into the leading/trailing counts.
+
+ASCII and Latin-1 text (every character below U+0100) skips the per-character
+Counter: the frequencies come from a 256-bin byte histogram (NumPy bincount
+for large inputs, otherwise bytes.translate/bytes.count), and the counts
+table is read from a 256-entry class table built from the same character
+tests, so the results are identical to the general path.
+
+Character names, categories and printability are looked up once per distinct
+character per process and kept in an LRU cache (PROPERTY_CACHE_SIZE). A
+precomputed table for the whole BMP can be built once and loaded at startup,
+so even first lookups skip unicodedata:
+  python3 input_inspector.py --build-unicode-table bmp.uprops
+  python3 input_inspector.py --unicode-table bmp.uprops --file big.log
+  INSPECTOR_UNICODE_TABLE=bmp.uprops python3 input_inspector.py hello
+The table records the Unicode version it was built with and is ignored if
+that differs from the running Python's. --cache-stats prints hit rates to
+stderr when the run ends.
+
+For keeping many results in memory, compact_analyze() returns a
+CompactInspection instead of the dict: per-character data lives in parallel
+array.array columns (codepoint, count, category code) and the words list,
+names and char_details are only built when they are accessed. It supports
+the same info['key'] / info.get() reads, so pretty_print() accepts it.
+  python3 input_inspector.py --bench-memory 100000
+compares the memory held by N dict results and N compact results.
+
+Follow mode watches a growing file (like tail -f) and keeps one
+InspectionState, feeding it only the bytes appended since the last read:
+  python3 input_inspector.py --follow app.log --interval 5
+A summary is re-printed every --interval seconds (default 2) when the file has
+changed; it is read from the running totals, so each render costs the same
+however much text has been seen. If the file is truncated or replaced, the
+statistics restart from the beginning of the new file. Stop with Ctrl-C.
+
+Corpus mode inspects many files concurrently:
+  python3 input_inspector.py --files logs/ 'data/**/*.txt' [--workers 32] [--max-inflight 64]
+Directories are walked recursively and globs are expanded. A thread pool
+reads files (at most --max-inflight at a time) while a process pool runs the
+inspection; files over FILE_INLINE_LIMIT bytes are read by the worker
+itself. One tab-separated row is printed per file as it finishes
+(path, chars, bytes, words, unique, ascii), then a merged corpus summary.
 """
+import asyncio
+import codecs
+import glob
+import os
+import struct
 import sys
 import unicodedata
+import random
 import string
+import time
+import tracemalloc
+from array import array
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+
+# Bytes read per chunk in file mode
+FILE_CHUNK_SIZE = 1 << 20
+
+# File-mode inputs up to this many characters get the full analyze() report
+KEEP_TEXT_LIMIT = 1 << 16
+
+# Characters of a large input kept for the "Original" line
+PREVIEW_CHARS = 200
+
+# Whitespace stripped for the leading/trailing counts
+EDGE_WHITESPACE = '\t\n\r '
+
+PUNCT_SET = frozenset(string.punctuation)
+
+# Files smaller than this are never split into shards
+MIN_SHARD_SIZE = 8 << 20
+
+# Corpus mode: files larger than this are read inside the worker process
+FILE_INLINE_LIMIT = 16 << 20
+
+# Corpus mode: default bound on files being read or analyzed at once
+MAX_INFLIGHT_FILES = 64
+
+# Strings shorter than this are counted with Counter directly
+FAST_PATH_MIN_CHARS = 256
+
+# Byte strings at least this long use NumPy (if installed) for the histogram
+NUMPY_MIN_BYTES = 1 << 20
+
+_ALL_BYTES = bytes(range(256))
+
+# Distinct characters kept by the Unicode property cache
+PROPERTY_CACHE_SIZE = 1 << 16
+
+UNICODE_CATEGORIES = (
+    'Lu', 'Ll', 'Lt', 'Lm', 'Lo', 'Mn', 'Mc', 'Me', 'Nd', 'Nl', 'No',
+    'Pc', 'Pd', 'Ps', 'Pe', 'Pi', 'Pf', 'Po', 'Sm', 'Sc', 'Sk', 'So',
+    'Zs', 'Zl', 'Zp', 'Cc', 'Cf', 'Cs', 'Co', 'Cn',
+)
+_CATEGORY_CODES = {cat: i for i, cat in enumerate(UNICODE_CATEGORIES)}
+
+# Property table file: header, then 0x10000 flag bytes (category code, high
+# bit = printable), 0x10001 little-endian uint32 name offsets, name bytes.
+PROPERTY_TABLE_MAGIC = b'UPRP'
+PROPERTY_TABLE_HEADER = struct.Struct('<4s16s')
+BMP_SIZE = 0x10000
+
+_property_table = None
+_property_stats = {'table_hits': 0, 'computed': 0}
 
 
 def get_input():
@@ -29,23 +150,61 @@ def is_printable(ch):
     return ch.isprintable()
 
 
-def analyze(s):
-    info = {}
-    info['original'] = s
-    info['length_chars'] = len(s)
-    info['length_bytes_utf8'] = len(s.encode('utf-8'))
-    info['ascii_only'] = s.isascii()
+def char_class(ch):
+    # Category bucket used by the counts table; letters also count as
+    # upper/lower where that applies
+    if ch.isalpha():
+        return 'letters'
+    if ch.isdigit():
+        return 'digits'
+    if ch.isspace():
+        return 'whitespace'
+    if ch in PUNCT_SET:
+        return 'punctuation'
+    return 'others'
 
-    # whitespace trimming
-    info['leading_whitespace'] = len(s) - len(s.lstrip('\t\n\r '))
-    info['trailing_whitespace'] = len(s) - len(s.rstrip('\t\n\r '))
 
-    # words (split on whitespace)
-    words = s.split()
-    info['word_count'] = len(words)
-    info['words'] = words
+# (class, is_upper, is_lower) for every code point below 256
+_LATIN1_CLASSES = [(char_class(chr(b)), chr(b).isupper(), chr(b).islower()) for b in range(256)]
+
 
-    # counts
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def byte_frequencies(data):
+    # Counter of chr(byte) -> count in first-occurrence order, matching
+    # Counter(data.decode('latin-1')) without a per-byte Python step.
+    np = _numpy() if len(data) >= NUMPY_MIN_BYTES else None
+    if np is not None:
+        counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256).tolist()
+        present = [b for b in range(256) if counts[b]]
+    else:
+        missing = set(_ALL_BYTES.translate(None, data))
+        present = [b for b in range(256) if b not in missing]
+        counts = {b: data.count(bytes((b,))) for b in present}
+    present.sort(key=lambda b: data.find(bytes((b,))))
+    return Counter({chr(b): counts[b] for b in present})
+
+
+def char_frequencies(s):
+    if len(s) >= FAST_PATH_MIN_CHARS:
+        try:
+            data = s.encode('latin-1')
+        except UnicodeEncodeError:
+            data = None
+        if data is not None:
+            return byte_frequencies(data)
+    return Counter(s)
+
+
+def classify_counts(freq):
+    # Counts are a function of the frequency table alone, so each distinct
+    # character is classified once instead of once per occurrence.
     counts = {
         'letters': 0,
         'digits': 0,
@@ -55,84 +214,790 @@ def analyze(s):
         'lower': 0,
         'others': 0
     }
-    punct_set = set(string.punctuation)
-    freq = Counter()
-    for ch in s:
-        freq[ch] += 1
-        if ch.isalpha():
-            counts['letters'] += 1
-            if ch.isupper():
-                counts['upper'] += 1
-            if ch.islower():
-                counts['lower'] += 1
-        elif ch.isdigit():
-            counts['digits'] += 1
-        elif ch.isspace():
-            counts['whitespace'] += 1
-        elif ch in punct_set:
-            counts['punctuation'] += 1
+    table = _LATIN1_CLASSES
+    for ch, cnt in freq.items():
+        cp = ord(ch)
+        if cp < 256:
+            cls, upper, lower = table[cp]
         else:
-            counts['others'] += 1
-    info['counts'] = counts
+            cls = char_class(ch)
+            upper = lower = cls == 'letters'
+            if upper:
+                upper = ch.isupper()
+                lower = ch.islower()
+        counts[cls] += cnt
+        if cls == 'letters':
+            if upper:
+                counts['upper'] += cnt
+            if lower:
+                counts['lower'] += cnt
+    return counts
+
+
+def build_property_table(path):
+    flags = bytearray(BMP_SIZE)
+    offsets = array('I', [0])
+    names = bytearray()
+    for cp in range(BMP_SIZE):
+        ch = chr(cp)
+        flags[cp] = _CATEGORY_CODES[unicodedata.category(ch)] | (0x80 if is_printable(ch) else 0)
+        names += unicodedata.name(ch, '').encode('ascii')
+        offsets.append(len(names))
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+    with open(path, 'wb') as f:
+        f.write(PROPERTY_TABLE_HEADER.pack(PROPERTY_TABLE_MAGIC, unicodedata.unidata_version.encode()))
+        f.write(flags)
+        f.write(offsets.tobytes())
+        f.write(names)
+
+
+def load_property_table(path):
+    # Returns False (and keeps using unicodedata) if the table is unusable
+    global _property_table
+    with open(path, 'rb') as f:
+        data = f.read()
+    hsize = PROPERTY_TABLE_HEADER.size
+    if len(data) < hsize + BMP_SIZE + 4 * (BMP_SIZE + 1):
+        return False
+    magic, version = PROPERTY_TABLE_HEADER.unpack_from(data)
+    if magic != PROPERTY_TABLE_MAGIC or version.rstrip(b'\0').decode() != unicodedata.unidata_version:
+        return False
+    flags = data[hsize:hsize + BMP_SIZE]
+    offsets = array('I')
+    offsets.frombytes(data[hsize + BMP_SIZE:hsize + BMP_SIZE + 4 * (BMP_SIZE + 1)])
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+    names = data[hsize + BMP_SIZE + 4 * (BMP_SIZE + 1):]
+    _property_table = (flags, offsets, names)
+    char_properties.cache_clear()
+    return True
+
+
+@lru_cache(maxsize=PROPERTY_CACHE_SIZE)
+def char_properties(ch):
+    # (name, category, printable) for one character
+    cp = ord(ch)
+    table = _property_table
+    if table is not None and cp < BMP_SIZE:
+        flags, offsets, names = table
+        _property_stats['table_hits'] += 1
+        name = names[offsets[cp]:offsets[cp + 1]].decode('ascii') or '<no name>'
+        return name, UNICODE_CATEGORIES[flags[cp] & 0x7F], bool(flags[cp] & 0x80)
+    _property_stats['computed'] += 1
+    try:
+        name = unicodedata.name(ch)
+    except ValueError:
+        name = '<no name>'
+    return name, unicodedata.category(ch), is_printable(ch)
+
+
+def property_cache_stats():
+    info = char_properties.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'lookups': lookups,
+        'cache_hits': info.hits,
+        'table_hits': _property_stats['table_hits'],
+        'computed': _property_stats['computed'],
+        'cached_chars': info.currsize,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+    }
+
+
+def print_cache_stats(file=sys.stderr):
+    st = property_cache_stats()
+    print(f"Unicode property lookups: {st['lookups']}", file=file)
+    print(f"  LRU hits: {st['cache_hits']} ({st['hit_rate']:.1%})", file=file)
+    print(f"  From table: {st['table_hits']}", file=file)
+    print(f"  From unicodedata: {st['computed']}", file=file)
+    print(f"  Cached characters: {st['cached_chars']}", file=file)
 
-    # unique chars and frequency sorted
-    info['unique_chars'] = len(freq)
-    info['freq_top'] = freq.most_common(20)
 
+def char_details(freq):
     # per-character details (codepoint, hex, category, name)
-    char_details = []
+    details = []
     for ch, cnt in freq.items():
         cp = ord(ch)
-        try:
-            name = unicodedata.name(ch)
-        except ValueError:
-            name = '<no name>'
-        cat = unicodedata.category(ch)
-        char_details.append({
+        name, cat, printable = char_properties(ch)
+        details.append({
             'char': ch,
             'count': cnt,
             'codepoint_dec': cp,
             'codepoint_hex': hex(cp),
             'category': cat,
             'name': name,
-            'printable': is_printable(ch)
+            'printable': printable
         })
-    info['char_details'] = sorted(char_details, key=lambda d: (-d['count'], d['codepoint_dec']))
+    return sorted(details, key=lambda d: (-d['count'], d['codepoint_dec']))
+
+
+def analyze(s):
+    info = {}
+    info['original'] = s
+    info['length_chars'] = len(s)
+    info['length_bytes_utf8'] = len(s.encode('utf-8'))
+    info['ascii_only'] = s.isascii()
+
+    # whitespace trimming
+    info['leading_whitespace'] = len(s) - len(s.lstrip('\t\n\r '))
+    info['trailing_whitespace'] = len(s) - len(s.rstrip('\t\n\r '))
+
+    # words (split on whitespace)
+    words = s.split()
+    info['word_count'] = len(words)
+    info['words'] = words
+
+    freq = char_frequencies(s)
+    info['counts'] = classify_counts(freq)
+
+    # unique chars and frequency sorted
+    info['unique_chars'] = len(freq)
+    info['freq_top'] = freq.most_common(20)
+    info['char_details'] = char_details(freq)
 
     # numeric detection
     info['is_int'] = False
     info['is_float'] = False
-    try:
-        iv = int(s)
+    kind, value = detect_number(s)
+    if kind == 'int':
         info['is_int'] = True
-        info['int_value'] = iv
+        info['int_value'] = value
+    elif kind == 'float':
+        info['is_float'] = True
+        info['float_value'] = value
+
+    # palindrome (ignore whitespace and case)
+    (info['is_palindrome_case_sensitive'],
+     info['is_palindrome_case_insensitive']) = palindrome_checks(s)
+
+    return info
+
+
+def detect_number(s):
+    # ('int', value), ('float', value) or (None, None)
+    try:
+        return 'int', int(s)
     except Exception:
         try:
-            fv = float(s)
-            info['is_float'] = True
-            info['float_value'] = fv
+            return 'float', float(s)
         except Exception:
-            pass
+            return None, None
 
-    # palindrome (ignore whitespace and case)
+
+def palindrome_checks(s):
     stripped = ''.join(ch for ch in s if not ch.isspace())
-    info['is_palindrome_case_sensitive'] = stripped == stripped[::-1]
-    info['is_palindrome_case_insensitive'] = stripped.lower() == stripped.lower()[::-1]
+    return stripped == stripped[::-1], stripped.lower() == stripped.lower()[::-1]
 
-    return info
+
+_COUNT_KEYS = ('letters', 'digits', 'whitespace', 'punctuation', 'upper', 'lower', 'others')
+
+# CompactInspection.flags bits
+_IS_INT = 1
+_IS_FLOAT = 2
+_PALINDROME_CS = 4
+_PALINDROME_CI = 8
+_PALINDROME_CHECKED = 16
+_TRUNCATED = 32
+
+
+class CompactInspection:
+    # Same information as the analyze() dict; see the module docstring
+
+    __slots__ = ('original', 'length_chars', 'length_bytes_utf8', 'word_count',
+                 'leading_whitespace', 'trailing_whitespace', 'flags', 'number',
+                 'count_values', 'codepoints', 'char_counts', 'categories')
+
+    def __init__(self, original, length_chars, length_bytes, leading, trailing,
+                 word_count, freq, flags, number=None):
+        self.original = original
+        self.length_chars = length_chars
+        self.length_bytes_utf8 = length_bytes
+        self.leading_whitespace = leading
+        self.trailing_whitespace = trailing
+        self.word_count = word_count
+        self.flags = flags
+        self.number = number
+        counts = classify_counts(freq)
+        self.count_values = tuple(counts[k] for k in _COUNT_KEYS)
+        # columns stay in first-occurrence order so most_common() ties match
+        self.codepoints = array('I', map(ord, freq))
+        self.char_counts = array('Q', freq.values())
+        self.categories = array('B', [_CATEGORY_CODES[unicodedata.category(ch)] for ch in freq])
+
+    @property
+    def ascii_only(self):
+        return not self.codepoints or max(self.codepoints) < 128
+
+    @property
+    def truncated(self):
+        return bool(self.flags & _TRUNCATED)
+
+    @property
+    def words(self):
+        return None if self.truncated else self.original.split()
+
+    @property
+    def counts(self):
+        return dict(zip(_COUNT_KEYS, self.count_values))
+
+    @property
+    def unique_chars(self):
+        return len(self.codepoints)
+
+    @property
+    def freq_top(self):
+        order = sorted(range(len(self.codepoints)), key=self.char_counts.__getitem__, reverse=True)
+        return [(chr(self.codepoints[i]), self.char_counts[i]) for i in order[:20]]
+
+    @property
+    def char_details(self):
+        details = []
+        for cp, cnt, cat in zip(self.codepoints, self.char_counts, self.categories):
+            ch = chr(cp)
+            name, _, printable = char_properties(ch)
+            details.append({
+                'char': ch,
+                'count': cnt,
+                'codepoint_dec': cp,
+                'codepoint_hex': hex(cp),
+                'category': UNICODE_CATEGORIES[cat],
+                'name': name,
+                'printable': printable
+            })
+        return sorted(details, key=lambda d: (-d['count'], d['codepoint_dec']))
+
+    def _palindrome(self, bit):
+        if not self.flags & _PALINDROME_CHECKED:
+            return None
+        return bool(self.flags & bit)
+
+    def __getitem__(self, key):
+        if key == 'is_int':
+            return bool(self.flags & _IS_INT)
+        if key == 'is_float':
+            return bool(self.flags & _IS_FLOAT)
+        if key == 'int_value' and self.flags & _IS_INT:
+            return self.number
+        if key == 'float_value' and self.flags & _IS_FLOAT:
+            return self.number
+        if key == 'is_palindrome_case_sensitive':
+            return self._palindrome(_PALINDROME_CS)
+        if key == 'is_palindrome_case_insensitive':
+            return self._palindrome(_PALINDROME_CI)
+        if key in _INFO_ATTRIBUTES:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        info = {key: self[key] for key in _INFO_KEYS}
+        if self.truncated:
+            info['truncated'] = True
+        for key in ('int_value', 'float_value'):
+            if key in self:
+                info[key] = self[key]
+        return info
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+
+_MISSING = object()
+_INFO_ATTRIBUTES = frozenset((
+    'original', 'length_chars', 'length_bytes_utf8', 'ascii_only', 'leading_whitespace',
+    'trailing_whitespace', 'word_count', 'words', 'counts', 'unique_chars', 'freq_top',
+    'char_details', 'truncated',
+))
+_INFO_KEYS = (
+    'original', 'length_chars', 'length_bytes_utf8', 'ascii_only', 'leading_whitespace',
+    'trailing_whitespace', 'word_count', 'words', 'counts', 'unique_chars', 'freq_top',
+    'char_details', 'is_int', 'is_float', 'is_palindrome_case_sensitive',
+    'is_palindrome_case_insensitive',
+)
+
+
+def compact_analyze(s, length_bytes=None):
+    flags = _PALINDROME_CHECKED
+    kind, number = detect_number(s)
+    if kind == 'int':
+        flags |= _IS_INT
+    elif kind == 'float':
+        flags |= _IS_FLOAT
+    else:
+        number = None
+    cs, ci = palindrome_checks(s)
+    if cs:
+        flags |= _PALINDROME_CS
+    if ci:
+        flags |= _PALINDROME_CI
+    if length_bytes is None:
+        length_bytes = len(s.encode('utf-8'))
+    return CompactInspection(
+        s, len(s), length_bytes,
+        len(s) - len(s.lstrip(EDGE_WHITESPACE)), len(s) - len(s.rstrip(EDGE_WHITESPACE)),
+        len(s.split()), char_frequencies(s), flags, number)
+
+
+class InspectionState:
+    # Incremental version of analyze(): feed text (update) or raw UTF-8
+    # bytes (update_bytes) in any chunking, then call result().
+
+    def __init__(self):
+        self.length_chars = 0
+        self.length_bytes = 0
+        self.ascii_only = True
+        self.leading = 0
+        self.leading_done = False
+        self.trailing = 0
+        self.word_count = 0
+        self.starts_in_word = False
+        self.in_word = False
+        self.freq = Counter()
+        self.kept = []
+        self.kept_chars = 0
+        self.kept_all = True
+        self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+
+    def update(self, text, byte_length=None):
+        if not text:
+            return
+        n = len(text)
+        if self.length_chars == 0:
+            self.starts_in_word = not text[0].isspace()
+        self.length_chars += n
+        self.length_bytes += len(text.encode('utf-8')) if byte_length is None else byte_length
+        if self.ascii_only and not text.isascii():
+            self.ascii_only = False
+
+        if not self.leading_done:
+            lead = n - len(text.lstrip(EDGE_WHITESPACE))
+            self.leading += lead
+            self.leading_done = lead < n
+        trail = n - len(text.rstrip(EDGE_WHITESPACE))
+        self.trailing = self.trailing + trail if trail == n else trail
+
+        # a word continued from the previous chunk was already counted
+        words = len(text.split())
+        if words and self.in_word and not text[0].isspace():
+            words -= 1
+        self.word_count += words
+        self.in_word = not text[-1].isspace()
+
+        self.freq.update(char_frequencies(text))
+
+        self._keep(text, n)
+
+    def _keep(self, text, n):
+        if self.kept_all:
+            if self.kept_chars + n <= KEEP_TEXT_LIMIT:
+                self.kept.append(text)
+                self.kept_chars += n
+            else:
+                self.kept_all = False
+                preview = ''.join(self.kept) + text[:PREVIEW_CHARS]
+                self.kept = [preview[:PREVIEW_CHARS]]
+
+    def update_bytes(self, data, final=False):
+        # Undecoded bytes of a split character wait in the decoder, so they
+        # are counted once the character is complete.
+        self.length_bytes += len(data)
+        self.update(self._decoder.decode(data, final), byte_length=0)
+
+    def finish(self):
+        # Flush a dangling partial character (decoded as U+FFFD)
+        self.update_bytes(b'', final=True)
+        return self
+
+    def merge(self, other, adjacent=True):
+        # Append the statistics of `other`, which must cover the text that
+        # directly follows this state's text. Both must be finished. With
+        # adjacent=False the texts are separate documents, so a word at the
+        # end of one and the start of the other is counted twice.
+        if other.length_chars == 0:
+            self.length_bytes += other.length_bytes
+            return self
+        if self.length_chars == 0:
+            self.starts_in_word = other.starts_in_word
+        self.word_count += other.word_count
+        if adjacent and self.in_word and other.starts_in_word:
+            self.word_count -= 1
+        self.in_word = other.in_word
+
+        if not self.leading_done:
+            self.leading += other.leading
+            self.leading_done = other.leading_done
+        if other.trailing == other.length_chars:
+            self.trailing += other.trailing
+        else:
+            self.trailing = other.trailing
+
+        self.length_chars += other.length_chars
+        self.length_bytes += other.length_bytes
+        self.ascii_only = self.ascii_only and other.ascii_only
+        self.freq.update(other.freq)
+
+        if other.kept_all:
+            self._keep(''.join(other.kept), other.kept_chars)
+        else:
+            self._keep(other.kept[0], KEEP_TEXT_LIMIT + 1)
+        return self
+
+    def compact_result(self):
+        self.finish()
+        if self.kept_all:
+            return compact_analyze(''.join(self.kept), self.length_bytes)
+        return CompactInspection(
+            self.kept[0], self.length_chars, self.length_bytes, self.leading, self.trailing,
+            self.word_count, self.freq, _TRUNCATED)
+
+    def result(self):
+        self.finish()
+        return self.snapshot()
+
+    def _seen_bytes(self):
+        # bytes of a character still waiting in the decoder are not counted yet
+        return self.length_bytes - len(self._decoder.getstate()[0])
+
+    def summary(self):
+        # The print_summary() fields for the text seen so far, read straight
+        # from the running totals: no re-analysis of the kept text and no
+        # per-character details, so follow mode can call it every interval
+        return {
+            'length_chars': self.length_chars,
+            'length_bytes_utf8': self._seen_bytes(),
+            'word_count': self.word_count,
+            'unique_chars': len(self.freq),
+            'trailing_whitespace': self.trailing,
+            'counts': classify_counts(self.freq),
+            'freq_top': self.freq.most_common(20),
+        }
+
+    def snapshot(self):
+        # Report for the text seen so far without flushing the decoder, so
+        # more bytes can still be fed afterwards
+        length_bytes = self._seen_bytes()
+        if self.kept_all:
+            info = analyze(''.join(self.kept))
+            info['length_bytes_utf8'] = length_bytes
+            return info
+        info = {}
+        info['original'] = self.kept[0]
+        info['truncated'] = True
+        info['length_chars'] = self.length_chars
+        info['length_bytes_utf8'] = length_bytes
+        info['ascii_only'] = self.ascii_only
+        info['leading_whitespace'] = self.leading
+        info['trailing_whitespace'] = self.trailing
+        info['word_count'] = self.word_count
+        info['words'] = None
+        info['counts'] = classify_counts(self.freq)
+        info['unique_chars'] = len(self.freq)
+        info['freq_top'] = self.freq.most_common(20)
+        info['char_details'] = char_details(self.freq)
+        info['is_int'] = False
+        info['is_float'] = False
+        info['is_palindrome_case_sensitive'] = None
+        info['is_palindrome_case_insensitive'] = None
+        return info
+
+
+def analyze_stream(f, chunk_size=FILE_CHUNK_SIZE):
+    # f is a binary file object
+    state = InspectionState()
+    while True:
+        data = f.read(chunk_size)
+        if not data:
+            break
+        state.update_bytes(data)
+    return state.result()
+
+
+def shard_ranges(path, shards):
+    # Byte ranges whose edges sit on UTF-8 character starts
+    size = os.path.getsize(path)
+    step = max(1, -(-size // shards))
+    edges = [0]
+    with open(path, 'rb') as f:
+        for pos in range(step, size, step):
+            f.seek(pos)
+            head = f.read(4)
+            # skip continuation bytes (0b10xxxxxx) of a character cut in half
+            skip = 0
+            while skip < len(head) and 0x80 <= head[skip] < 0xC0:
+                skip += 1
+            if pos + skip > edges[-1]:
+                edges.append(pos + skip)
+    edges.append(size)
+    return [(a, b) for a, b in zip(edges, edges[1:]) if b > a]
+
+
+def inspect_shard(path, start, end, chunk_size=FILE_CHUNK_SIZE):
+    state = InspectionState()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            state.update_bytes(data)
+    return state.finish()
+
+
+def inspect_file(path, workers=None):
+    # Returns the finished InspectionState for a whole file
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    shards = min(workers, size // MIN_SHARD_SIZE)
+    if shards <= 1:
+        return inspect_shard(path, 0, size)
+    total = InspectionState()
+    with ProcessPoolExecutor(max_workers=shards) as pool:
+        futures = [pool.submit(inspect_shard, path, a, b) for a, b in shard_ranges(path, shards)]
+        for fut in futures:
+            total.merge(fut.result())
+    return total
+
+
+def _walk_files(top):
+    for root, dirs, files in os.walk(top):
+        dirs.sort()
+        for name in sorted(files):
+            yield os.path.join(root, name)
+
+
+def expand_paths(patterns):
+    # Files named by paths, directories (recursive) and glob patterns; a file
+    # matched by more than one pattern is inspected once
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = _walk_files(pattern)
+        elif os.path.isfile(pattern):
+            matches = [pattern]
+        else:
+            matches = [p for p in sorted(glob.glob(pattern, recursive=True)) if os.path.isfile(p)]
+            if not matches:
+                print(f"No files match {pattern}", file=sys.stderr)
+        for path in matches:
+            key = os.path.realpath(path)
+            if key not in seen:
+                seen.add(key)
+                yield path
+
+
+def _read_file(path):
+    # Runs in the reader thread pool; big files are left to the worker
+    if os.path.getsize(path) > FILE_INLINE_LIMIT:
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def inspect_bytes(data):
+    state = InspectionState()
+    state.update_bytes(data)
+    return state.finish()
+
+
+def _inspect_path(path):
+    return inspect_shard(path, 0, os.path.getsize(path))
+
+
+async def inspect_files(paths, on_result, workers=None, max_inflight=MAX_INFLIGHT_FILES):
+    # Calls on_result(path, state_or_None, error_or_None) as files finish and
+    # returns the merged corpus state and the error count
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(max_inflight)
+    corpus = InspectionState()
+    errors = 0
+
+    with ThreadPoolExecutor(max_workers=min(max_inflight, 32)) as readers, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+
+        async def one(path):
+            async with limit:
+                try:
+                    data = await loop.run_in_executor(readers, _read_file, path)
+                    if data is None:
+                        state = await loop.run_in_executor(pool, _inspect_path, path)
+                    else:
+                        state = await loop.run_in_executor(pool, inspect_bytes, data)
+                except OSError as e:
+                    return path, None, e.strerror or str(e)
+                return path, state, None
+
+        pending = set()
+        for path in paths:
+            # keep the task list bounded as well as the I/O
+            if len(pending) >= 4 * max_inflight:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    errors += _collect(task.result(), corpus, on_result)
+            pending.add(asyncio.ensure_future(one(path)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                errors += _collect(task.result(), corpus, on_result)
+    return corpus, errors
+
+
+def _collect(outcome, corpus, on_result):
+    path, state, error = outcome
+    on_result(path, state, error)
+    if state is None:
+        return 1
+    corpus.merge(state, adjacent=False)
+    return 0
+
+
+def _print_file_row(path, state, error):
+    if error is not None:
+        print(f"{path}: {error}", file=sys.stderr)
+        return
+    print(f"{path}\t{state.length_chars}\t{state.length_bytes}\t{state.word_count}\t"
+          f"{len(state.freq)}\t{state.ascii_only}")
+
+
+def files_main(args):
+    workers = None
+    max_inflight = MAX_INFLIGHT_FILES
+    for name in ('--workers', '--max-inflight'):
+        if name in args:
+            i = args.index(name)
+            try:
+                value = int(args[i + 1])
+            except (IndexError, ValueError):
+                value = 0
+            if value <= 0:
+                print(f"{name} must be a positive integer", file=sys.stderr)
+                sys.exit(1)
+            del args[i:i + 2]
+            if name == '--workers':
+                workers = value
+            else:
+                max_inflight = value
+    if not args:
+        print("Usage: input_inspector.py --files DIR|GLOB|FILE ... [--workers N] [--max-inflight M]",
+              file=sys.stderr)
+        sys.exit(1)
+
+    print("path\tchars\tbytes\twords\tunique\tascii")
+    corpus, errors = asyncio.run(inspect_files(expand_paths(args), _print_file_row,
+                                               workers, max_inflight))
+    counts = classify_counts(corpus.freq)
+    top = ' '.join(f"{ch!r}:{cnt}" for ch, cnt in corpus.freq.most_common(10))
+    print()
+    print('=== Corpus summary ===')
+    print(f"Characters: {corpus.length_chars}")
+    print(f"UTF-8 bytes: {corpus.length_bytes}")
+    print(f"ASCII only: {corpus.ascii_only}")
+    print(f"Word count: {corpus.word_count}")
+    print(f"Unique characters: {len(corpus.freq)}")
+    for k, v in counts.items():
+        print(f"{k.capitalize():12}: {v}")
+    print(f"Top characters: {top}")
+    if errors:
+        print(f"Files that could not be read: {errors}", file=sys.stderr)
+
+
+def print_summary(info, file=sys.stdout):
+    counts = ', '.join(f"{k}={v}" for k, v in info['counts'].items())
+    top = ' '.join(f"{ch!r}:{cnt}" for ch, cnt in info['freq_top'][:8])
+    print(f"[{time.strftime('%H:%M:%S')}] chars={info['length_chars']} "
+          f"bytes={info['length_bytes_utf8']} words={info['word_count']} "
+          f"unique={info['unique_chars']} trailing_ws={info['trailing_whitespace']}", file=file)
+    print(f"  counts: {counts}", file=file)
+    print(f"  top: {top}", file=file)
+    file.flush()
+
+
+def follow_file(path, interval=2.0, render=print_summary, chunk_size=FILE_CHUNK_SIZE):
+    state = InspectionState()
+    f = open(path, 'rb')
+    offset = 0
+    changed = True
+    next_render = time.monotonic()
+    try:
+        while True:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                st = None
+            if st is not None and (st.st_ino != os.fstat(f.fileno()).st_ino or st.st_size < offset):
+                # rotated or truncated: start over on the current file
+                f.close()
+                f = open(path, 'rb')
+                state = InspectionState()
+                offset = 0
+                changed = True
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    break
+                offset += len(data)
+                state.update_bytes(data)
+                changed = True
+            now = time.monotonic()
+            if now >= next_render:
+                if changed:
+                    render(state.summary())
+                    changed = False
+                next_render = now + interval
+            time.sleep(min(interval, 0.5))
+    finally:
+        f.close()
+
+
+def follow_main(args):
+    interval = 2.0
+    if '--interval' in args:
+        i = args.index('--interval')
+        try:
+            interval = float(args[i + 1])
+        except (IndexError, ValueError):
+            interval = 0.0
+        if interval <= 0:
+            print("--interval must be a positive number of seconds", file=sys.stderr)
+            sys.exit(1)
+        del args[i:i + 2]
+    if not args:
+        print("Usage: input_inspector.py --follow FILE [--interval SECONDS]", file=sys.stderr)
+        sys.exit(1)
+    try:
+        follow_file(args[0], interval)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+
+
+def _yes_no_unknown(value):
+    return 'not checked (input too large)' if value is None else value
 
 
 def pretty_print(info):
     s = info['original']
     print('\n=== Input Inspector ===')
-    print(f"Original (raw): {repr(s)}")
+    if info.get('truncated'):
+        print(f"Original (first {len(s)} chars): {repr(s)}")
+    else:
+        print(f"Original (raw): {repr(s)}")
     print(f"Characters: {info['length_chars']}")
     print(f"UTF-8 bytes: {info['length_bytes_utf8']}")
     print(f"ASCII only: {info['ascii_only']}")
     print(f"Leading whitespace chars: {info['leading_whitespace']}")
     print(f"Trailing whitespace chars: {info['trailing_whitespace']}")
     print(f"Word count: {info['word_count']}")
-    if info['word_count'] > 0:
+    if info['word_count'] > 0 and info['words'] is not None:
         print(f"Words: {info['words']}")
     print('\n-- Character counts --')
     for k, v in info['counts'].items():
@@ -160,16 +1025,130 @@ def pretty_print(info):
         print('Not a pure number (int/float).')
 
     print('\n-- Palindrome checks --')
-    print(f"Palindrome (case-sensitive, ignore spaces): {info['is_palindrome_case_sensitive']}")
-    print(f"Palindrome (case-insensitive, ignore spaces): {info['is_palindrome_case_insensitive']}")
+    print("Palindrome (case-sensitive, ignore spaces): "
+          f"{_yes_no_unknown(info['is_palindrome_case_sensitive'])}")
+    print("Palindrome (case-insensitive, ignore spaces): "
+          f"{_yes_no_unknown(info['is_palindrome_case_insensitive'])}")
 
     print('\nDone.\n')
 
 
-def main():
-    s = get_input()
-    info = analyze(s)
+def file_main(args):
+    workers = None
+    if '--workers' in args:
+        i = args.index('--workers')
+        try:
+            workers = int(args[i + 1])
+        except (IndexError, ValueError):
+            workers = 0
+        if workers <= 0:
+            print("--workers must be a positive integer", file=sys.stderr)
+            sys.exit(1)
+        del args[i:i + 2]
+    path = args[0] if args else '-'
+    if path == '-':
+        info = analyze_stream(sys.stdin.buffer)
+    else:
+        try:
+            if os.path.isfile(path):
+                info = inspect_file(path, workers).result()
+            else:
+                with open(path, 'rb') as f:
+                    info = analyze_stream(f)
+        except OSError as e:
+            print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+            sys.exit(1)
     pretty_print(info)
 
+
+def _sample_records(n, seed=0):
+    rng = random.Random(seed)
+    words = ['hello', 'World', 'naïve', 'Ünïcödé', '12345', '3.14', 'foo,bar!', 'racecar',
+             '日本語', 'data', 'LOG', 'id=42', '😀', 'status:', 'OK']
+    return [' '.join(rng.choices(words, k=rng.randint(1, 8))) for _ in range(n)]
+
+
+def _held_memory(build, records):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = [build(r) for r in records]
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del results
+    return held
+
+
+def bench_memory(n):
+    records = _sample_records(n)
+    # warm the property cache so neither side is charged for it
+    for r in records[:1000]:
+        analyze(r)
+    as_dicts = _held_memory(analyze, records)
+    as_compact = _held_memory(compact_analyze, records)
+    print(f"Records: {n}")
+    print(f"dict results:    {as_dicts / 1e6:10.1f} MB ({as_dicts / n:.0f} bytes/record)")
+    print(f"compact results: {as_compact / 1e6:10.1f} MB ({as_compact / n:.0f} bytes/record)")
+    if as_compact:
+        print(f"Ratio: {as_dicts / as_compact:.1f}x smaller")
+
+
+def _setup_property_table(args):
+    # Handles --unicode-table PATH (or $INSPECTOR_UNICODE_TABLE) in place
+    path = os.environ.get('INSPECTOR_UNICODE_TABLE')
+    if '--unicode-table' in args:
+        i = args.index('--unicode-table')
+        if i + 1 >= len(args):
+            print("Missing value for --unicode-table", file=sys.stderr)
+            sys.exit(1)
+        path = args[i + 1]
+        del args[i:i + 2]
+    if not path:
+        return
+    try:
+        ok = load_property_table(path)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    if not ok:
+        print(f"Ignoring {path}: not a property table for Unicode {unicodedata.unidata_version}",
+              file=sys.stderr)
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) >= 2 and args[0] == '--build-unicode-table':
+        build_property_table(args[1])
+        print(f"Wrote {args[1]} (Unicode {unicodedata.unidata_version})")
+        return
+    _setup_property_table(args)
+    cache_stats = '--cache-stats' in args
+    if cache_stats:
+        args.remove('--cache-stats')
+    sys.argv[1:] = args
+
+    if len(sys.argv) >= 2 and sys.argv[1] == '--file':
+        file_main(sys.argv[2:])
+    elif len(sys.argv) >= 2 and sys.argv[1] == '--follow':
+        follow_main(sys.argv[2:])
+    elif len(sys.argv) >= 2 and sys.argv[1] == '--files':
+        files_main(sys.argv[2:])
+    elif len(sys.argv) >= 2 and sys.argv[1] == '--bench-memory':
+        n = 100000
+        if len(sys.argv) >= 3:
+            try:
+                n = int(sys.argv[2])
+            except ValueError:
+                n = 0
+        if n <= 0:
+            print("--bench-memory takes a positive record count", file=sys.stderr)
+            sys.exit(1)
+        bench_memory(n)
+    else:
+        s = get_input()
+        info = analyze(s)
+        pretty_print(info)
+    if cache_stats:
+        print_cache_stats()
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+line_shards.py
+Shared line-aligned sharding behind average_grade.py (--stats),
+bulk_parity.py (CSV input) and input_dissector.py (--lines).
+
+A file is cut into equal byte ranges, one per worker process. A shard owns
+every line that starts inside its range [start, end): open_shard() skips the
+partial line at `start`, which belongs to the previous shard, and
+iter_line_chunks() stops before the first line starting at or after `end`.
+Every line is therefore read by exactly one shard, wherever the cuts fall,
+and the shards' results can be combined in file order.
+
+  size = os.path.getsize(path)
+  for start, end in shard_ranges(size, shard_count(size, workers, 4 << 20)):
+      with open_shard(path, start) as f:
+          for lines in iter_line_chunks(f, 1 << 20, end):
+              ...
+"""
+import os
+import sys
+
+
+def shard_count(size, workers=None, min_shard_bytes=1):
+    # Shards worth using for a file of `size` bytes: at most `workers`
+    # (default one per CPU), each at least min_shard_bytes long. 1 means
+    # the file is read in a single pass.
+    workers = workers or os.cpu_count() or 1
+    return max(1, min(workers, size // min_shard_bytes))
+
+
+def shard_ranges(size, shards):
+    step = max(1, -(-size // shards))
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def open_shard(path, start, buffering=-1):
+    # Binary file positioned at the first line that starts at or after `start`
+    f = open(path, 'rb', buffering=buffering)
+    try:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()  # rest of the line owned by the previous shard
+    except BaseException:
+        f.close()
+        raise
+    return f
+
+
+def iter_line_chunks(f, chunk_size, end=None):
+    # Lists of whole lines (endings kept), about chunk_size bytes each, read
+    # from the binary file f. With `end`, stops before the first line that
+    # starts at or after that offset.
+    pos = f.tell() if end is not None else 0
+    while end is None or pos < end:
+        lines = f.readlines(chunk_size)
+        if not lines:
+            return
+        if end is not None:
+            n = 0
+            for line in lines:
+                if pos >= end:
+                    break
+                pos += len(line)
+                n += 1
+            del lines[n:]
+        yield lines
+
+
+def take_workers(args):
+    # Removes "--workers N" from args and returns N (None when absent);
+    # exits with a message when N is not a positive integer
+    if '--workers' not in args:
+        return None
+    i = args.index('--workers')
+    try:
+        workers = int(args[i + 1])
+    except (IndexError, ValueError):
+        workers = 0
+    if workers <= 0:
+        print("--workers must be a positive integer", file=sys.stderr)
+        sys.exit(1)
+    del args[i:i + 2]
+    return workers
+
+
+def throughput_line(count, elapsed, unit='lines'):
+    rate = count / elapsed if elapsed > 0 else 0.0
+    return f"Throughput: {rate / 1e6:.2f} M {unit}/sec ({elapsed:.2f} s)"
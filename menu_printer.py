@@ -2,13 +2,53 @@
 """
 menu_printer.py
 Prints a formatted restaurant menu to the terminal.
+
+Menus can also be loaded from files and rendered in bulk, one output file
+per menu:
+  python3 menu_printer.py --render menus.json --output rendered/ [--workers 8]
+  python3 menu_printer.py --render menus.csv --output rendered/
+  python3 menu_printer.py --bench [N] [--workers 8]
+
+JSON input is one menu object or a list of them:
+  {"id": "store-0042", "name": "The Rusty Spoon", "address": "...",
+   "sections": {"Starters": [["Bruschetta", "Tomato, basil...", 6.5], ...]}}
+Entries may also be objects with name/description/price keys; "id" and
+"footer" are optional. CSV input has the header
+  id,name,address,section,item,description,price
+with one row per entry; consecutive rows with the same id form one menu and
+sections keep their first-seen order.
+
+Each menu is written to OUTPUT/<id>.txt (menu00000.txt, ... without an id).
+Characters other than letters, digits, '.', '_' and '-' in an id become '_';
+when two menus would share a file name (repeated ids, ids that only differ
+in those characters or in case), the later ones get -2, -3, ... appended
+and a warning is printed.
+Batches of at least BATCH_MIN_MENUS menus are rendered in a process pool.
+
+Watch mode re-renders a menu file whenever it changes:
+  python3 menu_printer.py --watch menus.json [--output DIR] [--interval 1.0]
+Rendered sections are cached by their content (title and entries), so after
+a small edit only the sections that changed are rendered again and every
+document is reassembled from cached pieces. With --output, only menus whose
+text changed are rewritten, each atomically through a temporary file;
+without it the documents are printed to stdout after every change.
 """
+import csv
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-def print_menu():
-    name = "The Rusty Spoon"
-    address = "123 Main St. — Open 11:00 - 22:00"
 
-    items = {
+DEFAULT_FOOTER = "We accept cash and cards. Thank you for dining with us!"
+
+SAMPLE_MENU = {
+    'name': "The Rusty Spoon",
+    'address': "123 Main St. — Open 11:00 - 22:00",
+    'sections': {
         "Starters": [
             ("Bruschetta", "Tomato, basil, garlic on toasted bread", 6.50),
             ("Soup of the Day", "Chef's choice with fresh herbs", 5.00),
@@ -29,29 +69,373 @@ def print_menu():
             ("House Wine", "Red or White, glass", 7.00),
             ("Coffee", "Espresso or Americano", 3.00),
         ],
-    }
-
-    # Print header
-    print("+" + "="*46 + "+")
-    print(f"| {name:^44} |")
-    print(f"| {address:^44} |")
-    print("+" + "="*46 + "+")
-    print()
-
-    # Print sections
-    for section, entries in items.items():
-        print(f"{section}")
-        print('-' * len(section))
-        # Name (max 20), description (max 28), price (right-aligned)
-        for name_item, desc, price in entries:
-            name_fmt = name_item.ljust(20)[:20]
-            desc_fmt = desc.ljust(28)[:28]
-            price_fmt = f"${price:5.2f}"
-            print(f" {name_fmt}  {desc_fmt}  {price_fmt}")
-        print()
-
-    print("We accept cash and cards. Thank you for dining with us!")
+    },
+}
 
+# Layout, compiled once: a 46-wide box around the centered header lines,
+# then per entry the name (max 20), description (max 28) and the price
+# right-aligned after a $ sign
+_RULE = "+" + "=" * 46 + "+\n"
+_HEADER_LINE = "| {:^44} |\n".format
+_ROW = " {:<20.20}  {:<28.28}  ${:5.2f}\n".format
 
-if __name__ == '__main__':
+# Menus rendered per worker task, and the smallest batch worth a pool
+BATCH_CHUNK = 256
+BATCH_MIN_MENUS = 2048
+
+# Output file buffer size in batch mode
+WRITE_BUFFER = 1 << 16
+
+_ID_UNSAFE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def render_header(name, address):
+    return _RULE + _HEADER_LINE(name) + _HEADER_LINE(address) + _RULE + "\n"
+
+
+def render_section(section, entries):
+    parts = [section, "\n", "-" * len(section), "\n"]
+    parts.extend([_ROW(name, desc, price) for name, desc, price in entries])
+    parts.append("\n")
+    return ''.join(parts)
+
+
+def render_menu(menu):
+    # The whole menu as one string, exactly as print_menu() prints it
+    parts = [render_header(menu['name'], menu['address'])]
+    for section, entries in menu['sections'].items():
+        parts.append(render_section(section, entries))
+    parts.append(menu.get('footer', DEFAULT_FOOTER) + "\n")
+    return ''.join(parts)
+
+
+def print_menu(menu=None):
+    sys.stdout.write(render_menu(menu or SAMPLE_MENU))
+
+
+def _entry(raw):
+    if isinstance(raw, dict):
+        raw = (raw['name'], raw.get('description', ''), raw['price'])
+    name, desc, price = raw
+    # + 0.0 turns -0.0 into 0.0, which compares equal to it in SectionCache
+    return str(name), str(desc), float(price) + 0.0
+
+
+def normalize_menu(data):
+    # JSON-style dict -> menu with (name, description, float price) entries
+    if not isinstance(data, dict):
+        raise ValueError(f"Invalid menu: expected an object, got {type(data).__name__}")
+    try:
+        menu = {
+            'name': str(data['name']),
+            'address': str(data.get('address', '')),
+            'sections': {str(section): [_entry(e) for e in entries]
+                         for section, entries in data['sections'].items()},
+        }
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid menu {data.get('id', data.get('name', '?'))!r}: {e!r}") from None
+    if 'id' in data:
+        menu['id'] = str(data['id'])
+    if 'footer' in data:
+        menu['footer'] = str(data['footer'])
+    return menu
+
+
+def load_menus_csv(path):
+    menus = []
+    current = None
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                if current is None or current['id'] != row['id']:
+                    current = {'id': row['id'], 'name': row['name'], 'address': row['address'],
+                               'sections': {}}
+                    menus.append(current)
+                current['sections'].setdefault(row['section'], []).append(
+                    _entry((row['item'], row['description'], row['price'])))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"{path}, line {reader.line_num}: {e!r}") from None
+    return menus
+
+
+def load_menus(path):
+    if path.lower().endswith('.csv'):
+        return load_menus_csv(path)
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    return [normalize_menu(d) for d in data]
+
+
+def output_name(menu, index):
+    menu_id = _ID_UNSAFE.sub('_', menu.get('id', '')).strip('._')
+    return (menu_id or f"menu{index:05d}") + ".txt"
+
+
+def output_names(menus):
+    # One distinct file name per menu, in input order. Names are compared
+    # case-insensitively so they stay distinct on macOS and Windows too.
+    names = []
+    taken = set()
+    for i, menu in enumerate(menus):
+        name = output_name(menu, i)
+        stem = name[:-len(".txt")]
+        n = 1
+        while name.casefold() in taken:
+            n += 1
+            name = f"{stem}-{n}.txt"
+        taken.add(name.casefold())
+        names.append(name)
+    return names
+
+
+def warn_renamed(menus, names):
+    for i, (menu, name) in enumerate(zip(menus, names)):
+        if name != output_name(menu, i):
+            print(f"Warning: menu {menu.get('id', i)!r} written to {name} "
+                  f"(file name already used)", file=sys.stderr)
+
+
+def render_chunk(menus, names, out_dir):
+    # Worker: renders each menu to out_dir/<name>, returns the number written
+    for menu, name in zip(menus, names):
+        text = render_menu(menu)
+        with open(os.path.join(out_dir, name), 'w', encoding='utf-8',
+                  buffering=WRITE_BUFFER) as f:
+            f.write(text)
+    return len(menus)
+
+
+def render_batch(menus, out_dir, workers=None, names=None):
+    # -> number of menus written; names defaults to output_names(menus)
+    os.makedirs(out_dir, exist_ok=True)
+    if names is None:
+        names = output_names(menus)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(menus) < BATCH_MIN_MENUS:
+        return render_chunk(menus, names, out_dir)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_chunk, menus[start:start + BATCH_CHUNK],
+                               names[start:start + BATCH_CHUNK], out_dir)
+                   for start in range(0, len(menus), BATCH_CHUNK)]
+        return sum(fut.result() for fut in futures)
+
+
+class SectionCache:
+    # Rendered sections keyed by (title, entries). Keys compare by content,
+    # so a section is only rendered again when its title or an entry
+    # changes. render_menus() keeps just the sections the latest menus use.
+
+    def __init__(self):
+        self.sections = {}
+        self.rendered = 0
+        self.reused = 0
+
+    def render_menu(self, menu, used=None):
+        parts = [render_header(menu['name'], menu['address'])]
+        for section, entries in menu['sections'].items():
+            key = (section, tuple(entries))
+            text = self.sections.get(key)
+            if text is None:
+                text = self.sections[key] = render_section(section, entries)
+                self.rendered += 1
+            else:
+                self.reused += 1
+            if used is not None:
+                used[key] = text
+            parts.append(text)
+        parts.append(menu.get('footer', DEFAULT_FOOTER) + "\n")
+        return ''.join(parts)
+
+    def render_menus(self, menus):
+        used = {}
+        texts = [self.render_menu(menu, used) for menu in menus]
+        self.sections = used
+        return texts
+
+
+def _replace_file(path, text):
+    # Readers see either the old or the new document, never a partial one
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def watch_menus(path, out_dir=None, interval=1.0):
+    cache = SectionCache()
+    written = {}    # output name -> last text written
+    signature = None
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    while True:
+        try:
+            st = os.stat(path)
+            current = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            current = None
+        if current is not None and current != signature:
+            signature = current
+            started = time.perf_counter()
+            rendered, reused = cache.rendered, cache.reused
+            try:
+                menus = load_menus(path)
+            except ValueError as e:
+                # usually a file caught mid-write; the next change retries
+                print(f"Skipping update: {e}", file=sys.stderr)
+                menus = None
+            if menus is not None:
+                texts = cache.render_menus(menus)
+                changed = 0
+                if out_dir is None:
+                    sys.stdout.write(''.join(texts))
+                    sys.stdout.flush()
+                    changed = len(texts)
+                else:
+                    names = output_names(menus)
+                    warn_renamed(menus, names)
+                    for name, text in zip(names, texts):
+                        if written.get(name) != text:
+                            _replace_file(os.path.join(out_dir, name), text)
+                            written[name] = text
+                            changed += 1
+                elapsed = time.perf_counter() - started
+                print(f"Updated {changed}/{len(menus)} menus: "
+                      f"{cache.rendered - rendered} sections rendered, "
+                      f"{cache.reused - reused} reused ({elapsed * 1000:.1f} ms)", file=sys.stderr)
+        time.sleep(interval)
+
+
+def bench_menus(n):
+    # n copies of the sample menu, each with its own id and prices
+    menus = []
+    for i in range(n):
+        sections = {section: [(name, desc, price + (i % 100) / 100) for name, desc, price in entries]
+                    for section, entries in SAMPLE_MENU['sections'].items()}
+        menus.append({'id': f'bench-{i:06d}', 'name': f"{SAMPLE_MENU['name']} #{i}",
+                      'address': SAMPLE_MENU['address'], 'sections': sections})
+    return menus
+
+
+def _take_workers(args):
+    if '--workers' not in args:
+        return None
+    i = args.index('--workers')
+    try:
+        workers = int(args[i + 1])
+    except (IndexError, ValueError):
+        workers = 0
+    if workers <= 0:
+        print("--workers must be a positive integer", file=sys.stderr)
+        sys.exit(1)
+    del args[i:i + 2]
+    return workers
+
+
+def render_main(args):
+    workers = _take_workers(args)
+    out_dir = None
+    if '--output' in args:
+        i = args.index('--output')
+        if i + 1 < len(args):
+            out_dir = args[i + 1]
+        del args[i:i + 2]
+    if len(args) != 1 or out_dir is None:
+        print("Usage: menu_printer.py --render MENUS.json|MENUS.csv --output DIR [--workers N]",
+              file=sys.stderr)
+        sys.exit(1)
+    started = time.perf_counter()
+    try:
+        menus = load_menus(args[0])
+        names = output_names(menus)
+        warn_renamed(menus, names)
+        count = render_batch(menus, out_dir, workers, names)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Rendered {count} menus to {out_dir} ({rate:.0f} menus/sec)", file=sys.stderr)
+
+
+def bench_main(args):
+    workers = _take_workers(args)
+    try:
+        n = int(args[0]) if args else 20000
+    except ValueError:
+        n = 0
+    if n <= 0:
+        print("Usage: menu_printer.py --bench [N] [--workers N]", file=sys.stderr)
+        sys.exit(1)
+    menus = bench_menus(n)
+    clock = time.perf_counter
+
+    started = clock()
+    for menu in menus:
+        render_menu(menu)
+    render_time = clock() - started
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        started = clock()
+        render_batch(menus, out_dir, workers)
+        batch_time = clock() - started
+
+    print(f"Menus:           {n}")
+    print(f"render_menu():   {n / render_time:.0f} menus/sec (in memory, one process)")
+    print(f"render_batch():  {n / batch_time:.0f} menus/sec (to files, "
+          f"{workers or os.cpu_count() or 1} workers)")
+
+
+def watch_main(args):
+    interval = 1.0
+    if '--interval' in args:
+        i = args.index('--interval')
+        try:
+            interval = float(args[i + 1])
+        except (IndexError, ValueError):
+            interval = 0.0
+        if interval <= 0:
+            print("--interval must be a positive number of seconds", file=sys.stderr)
+            sys.exit(1)
+        del args[i:i + 2]
+    out_dir = None
+    if '--output' in args:
+        i = args.index('--output')
+        if i + 1 >= len(args):
+            print("Missing value for --output", file=sys.stderr)
+            sys.exit(1)
+        out_dir = args[i + 1]
+        del args[i:i + 2]
+    if len(args) != 1:
+        print("Usage: menu_printer.py --watch MENUS.json|MENUS.csv [--output DIR] [--interval SECONDS]",
+              file=sys.stderr)
+        sys.exit(1)
+    try:
+        watch_menus(args[0], out_dir, interval)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--watch':
+        watch_main(sys.argv[2:])
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == '--render':
+        render_main(sys.argv[2:])
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == '--bench':
+        bench_main(sys.argv[2:])
+        return
     print_menu()
+
+
+if __name__ == '__main__':
+    main()
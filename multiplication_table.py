@@ -17,8 +17,34 @@ Usage:
 
 The script accepts integers or floats for the base number. The table length
 (default 10) can be provided as a second argument or entered when prompted.
+
+Grid mode renders a full ROWS x COLS table (cell = row * col, both from 1):
+  python3 multiplication_table.py --grid 1000 1000
+  python3 multiplication_table.py --grid 1000 1000 --format csv --output table.csv
+  python3 multiplication_table.py --grid 1000 1000 --format binary --output table.bin
+
+Formats: text (cells right-aligned to the widest value, separated by one
+space), csv (no header) or binary (row-major little-endian int64). Rows are
+produced in blocks and each block is formatted into one buffer and written
+with a single write().
+
+Window mode prints any page of the (unbounded) table without producing the
+rows before it; cell = base * row * col:
+  python3 multiplication_table.py --window 1000000000 100              # 1 x 1000000000 = ...
+  python3 multiplication_table.py --window 1000000000 100 --base 7     # 7 x 1000000000 = ...
+  python3 multiplication_table.py --window 10**20 5 --cols 1 8 --base 1/3
+
+The base may be an integer, a fraction (1/3) or a decimal (2.75), and is kept
+exact: decimals are multiplied with enough precision for every digit.
+From Python, table_page() and iter_table_rows() give the same windows for
+int, float, Fraction and Decimal bases.
 """
+import itertools
+import math
 import sys
+from array import array
+from decimal import Decimal, localcontext
+from fractions import Fraction
 
 
 def parse_number(s):
@@ -44,18 +70,232 @@ def read_input(prompt_text):
         return None
 
 
+# Approximate number of cells (or print_table lines) formatted per block
+TABLE_BLOCK_CELLS = 1 << 18
+
+
+def format_value(x):
+    # Format nice: integers without .0
+    return str(int(x)) if float(x).is_integer() else f"{x}"
+
+
 def print_table(number, upto=10):
-    # If number is integral value like 7.0, print as int
-    base_fmt = "%g" if float(number).is_integer() else "{}"
-    for i in range(1, upto + 1):
-        result = number * i
-        # Format nice: integers without .0
-        def fmt(x):
-            return str(int(x)) if float(x).is_integer() else f"{x}"
-        print(f"{fmt(number)} x {i} = {fmt(result)}")
+    # one write per block keeps the writes few and memory flat for any upto
+    base = format_value(number)
+    for start in range(1, upto + 1, TABLE_BLOCK_CELLS):
+        stop = min(start + TABLE_BLOCK_CELLS, upto + 1)
+        sys.stdout.write(''.join([f"{base} x {i} = {format_value(number * i)}\n"
+                                  for i in range(start, stop)]))
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _text_block_numpy(np, block, width):
+    # Writes the digits of every cell straight into a (rows, cols, width + 1)
+    # byte buffer: right-aligned digits, then ' ' (or '\n' after the last cell).
+    rows, cols = block.shape
+    buf = np.full((rows, cols, width + 1), ord(' '), dtype=np.uint8)
+    buf[:, -1, width] = ord('\n')
+    values = block.copy()
+    for pos in range(width - 1, -1, -1):
+        digits = (values % 10).astype(np.uint8) + ord('0')
+        # blank out leading zeros (every cell is >= 1, so the last digit stays)
+        buf[:, :, pos] = np.where(values > 0, digits, ord(' '))
+        values //= 10
+    return buf.tobytes()
+
+
+def render_table(rows, cols, out, fmt='text', block_cells=TABLE_BLOCK_CELLS):
+    # Writes the rows x cols table to the binary file `out`
+    if fmt not in ('text', 'csv', 'binary'):
+        raise ValueError(f"Unknown format: {fmt}")
+    width = len(str(rows * cols))
+    block_rows = max(1, block_cells // max(cols, 1))
+    np = _numpy()
+    if np is not None:
+        col_values = np.arange(1, cols + 1, dtype=np.int64)
+    row_fmt = ' '.join([f'%{width}d'] * cols) + '\n'
+    for start in range(1, rows + 1, block_rows):
+        stop = min(start + block_rows, rows + 1)
+        if np is not None and fmt != 'csv':
+            block = np.outer(np.arange(start, stop, dtype=np.int64), col_values)
+            if fmt == 'binary':
+                out.write(block.astype('<i8', copy=False).tobytes())
+            else:
+                out.write(_text_block_numpy(np, block, width))
+            continue
+        # each row i is the arithmetic sequence i, 2i, ..., cols*i
+        if fmt == 'csv':
+            text = ''.join([','.join(map(str, range(i, i * cols + 1, i))) + '\n'
+                            for i in range(start, stop)])
+            out.write(text.encode('ascii'))
+        elif fmt == 'text':
+            text = ''.join([row_fmt % tuple(range(i, i * cols + 1, i)) for i in range(start, stop)])
+            out.write(text.encode('ascii'))
+        else:
+            block = array('q')
+            for i in range(start, stop):
+                block.extend(range(i, i * cols + 1, i))
+            if sys.byteorder == 'big':
+                block.byteswap()
+            out.write(block.tobytes())
+
+
+def table_cell(base, row, col=1):
+    # Multiply the exact integer product once, so float bases round only once
+    # and Decimal bases keep every digit.
+    product = row * col
+    if isinstance(base, Decimal):
+        with localcontext() as ctx:
+            ctx.prec = max(ctx.prec, len(base.as_tuple().digits) + len(str(abs(product))) + 1)
+            return base * product
+    if isinstance(base, float):
+        try:
+            return base * product
+        except OverflowError:
+            # the product is past float range: the cell is infinite (or 0)
+            return base * (math.inf if product > 0 else -math.inf) if base else base * 0
+    return base * product
+
+
+def iter_table_rows(base=1, row_start=1, row_stop=None, col_start=1, col_stop=None):
+    # Yields (row, [cells]) from row_start on; unbounded when row_stop is None.
+    # Nothing before row_start is ever computed.
+    if col_stop is None:
+        col_stop = col_start + 1
+    cols = range(col_start, col_stop)
+    rows = itertools.count(row_start) if row_stop is None else range(row_start, row_stop)
+    for row in rows:
+        yield row, [table_cell(base, row, col) for col in cols]
+
+
+def table_page(base, row_start, n_rows, col_start=1, n_cols=1):
+    # One rectangular page; cost depends only on the page size
+    return list(iter_table_rows(base, row_start, row_start + n_rows,
+                                col_start, col_start + n_cols))
+
+
+def format_cell(x):
+    if isinstance(x, int):
+        return str(x)
+    if isinstance(x, Fraction):
+        return str(x.numerator) if x.denominator == 1 else str(x)
+    if isinstance(x, Decimal):
+        # no normalize(): it would round to the context precision
+        text = f"{x:f}"
+        return text.rstrip('0').rstrip('.') if '.' in text else text
+    return format_value(x)
+
+
+def parse_base(s):
+    # Exact base for window mode: int, Fraction (a/b) or Decimal
+    try:
+        if '/' in s:
+            return Fraction(s)
+        if s.lstrip('+-').isdigit():
+            return int(s)
+        d = Decimal(s)
+        return d if d.is_finite() else None
+    except (ValueError, ZeroDivisionError, ArithmeticError):
+        return None
+
+
+def parse_row_number(s):
+    # Accepts plain integers and powers written as 10**9
+    if '**' in s:
+        base, _, exp = s.partition('**')
+        b, e = parse_int(base), parse_int(exp)
+        if b is None or e is None or e < 0:
+            return None
+        return b ** e
+    return parse_int(s)
+
+
+def window_main(args):
+    base = 1
+    col_start, n_cols = 1, 1
+    if '--base' in args:
+        i = args.index('--base')
+        base = parse_base(args[i + 1]) if i + 1 < len(args) else None
+        if base is None:
+            print("--base must be an integer, fraction or decimal", file=sys.stderr)
+            sys.exit(1)
+        del args[i:i + 2]
+    if '--cols' in args:
+        i = args.index('--cols')
+        col_start = parse_row_number(args[i + 1]) if i + 1 < len(args) else None
+        n_cols = parse_int(args[i + 2]) if i + 2 < len(args) else None
+        if col_start is None or n_cols is None or col_start <= 0 or n_cols <= 0:
+            print("--cols needs a positive start column and count", file=sys.stderr)
+            sys.exit(1)
+        del args[i:i + 3]
+    row_start = parse_row_number(args[0]) if len(args) >= 1 else None
+    n_rows = parse_int(args[1]) if len(args) >= 2 else None
+    if row_start is None or n_rows is None or row_start <= 0 or n_rows <= 0:
+        print("Usage: multiplication_table.py --window ROW_START ROWS [--cols COL_START COLS] [--base B]",
+              file=sys.stderr)
+        sys.exit(1)
+
+    base_text = format_cell(base)
+    lines = []
+    for row, cells in iter_table_rows(base, row_start, row_start + n_rows,
+                                      col_start, col_start + n_cols):
+        if n_cols == 1 and col_start == 1:
+            lines.append(f"{base_text} x {row} = {format_cell(cells[0])}\n")
+        else:
+            lines.append(f"{row}: " + ' '.join(map(format_cell, cells)) + '\n')
+    sys.stdout.write(''.join(lines))
+
+
+def grid_main(args):
+    fmt = 'text'
+    out_path = None
+    for name in ('--format', '--output'):
+        if name in args:
+            i = args.index(name)
+            if i + 1 >= len(args):
+                print(f"Missing value for {name}", file=sys.stderr)
+                sys.exit(1)
+            if name == '--format':
+                fmt = args[i + 1]
+            else:
+                out_path = args[i + 1]
+            del args[i:i + 2]
+    rows = parse_int(args[0]) if len(args) >= 1 else None
+    cols = parse_int(args[1]) if len(args) >= 2 else None
+    if rows is None or cols is None or rows <= 0 or cols <= 0:
+        print("Usage: multiplication_table.py --grid ROWS COLS [--format text|csv|binary] [--output FILE]",
+              file=sys.stderr)
+        sys.exit(1)
+    if fmt not in ('text', 'csv', 'binary'):
+        print(f"Unknown format: {fmt} (use text, csv or binary)", file=sys.stderr)
+        sys.exit(1)
+    try:
+        if out_path is None:
+            out = open(sys.stdout.fileno(), 'wb', closefd=False)
+        else:
+            out = open(out_path, 'wb')
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    with out:
+        render_table(rows, cols, out, fmt)
 
 
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--grid':
+        grid_main(sys.argv[2:])
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == '--window':
+        window_main(sys.argv[2:])
+        return
+
     number = None
     upto = 10
 
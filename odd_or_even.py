@@ -3,41 +3,199 @@
 odd_or_even.py
 Simple script that asks for a whole number and prints whether it's odd or even.
 Handles EOF (Ctrl-D) and validates input.
+
+Parity is read off the last digit once the sign and digits are validated,
+so the number is never converted to an int (int() refuses strings longer
+than the interpreter's digit limit and is quadratic on very long ones).
+
+File modes:
+  python3 odd_or_even.py --file huge_number.txt         # one number, read in chunks
+  python3 odd_or_even.py --lines numbers.txt [--summary-only]
+  cat numbers.txt | python3 odd_or_even.py --lines -
+
+--lines prints even, odd or invalid for every input line, then the
+totals and the throughput in lines/sec on stderr (stdout with --summary-only).
+Integer columns already in binary form (.npy, raw int64) are handled by
+bulk_parity.py.
 """
 import sys
+import time
+
+
+# Characters read per chunk in --file mode and bytes per chunk in --lines mode
+READ_CHUNK_SIZE = 1 << 20
+
+PARITIES = ('even', 'odd', 'invalid')
+
+
+def split_number(s):
+    # -> (sign, digits) for an optional leading + or - and decimal digits,
+    # None otherwise. Any Unicode decimal digit is accepted, as int() does.
+    s = s.strip()
+    sign = ''
+    if s[:1] in ('+', '-'):
+        sign, s = s[0], s[1:]
+    if not s.isdecimal():
+        return None
+    return sign, s
 
 
-def read_int(prompt_text="Enter a whole number: "):
+def parity(s):
+    # 'even', 'odd' or None for text that is not a whole number
+    parts = split_number(s)
+    if parts is None:
+        return None
+    return PARITIES[int(parts[1][-1]) & 1]
+
+
+def canonical_number(sign, digits):
+    # The text str(int(...)) would give, without building the int
+    digits = digits.lstrip('0')
+    if not digits.isascii():
+        digits = ''.join(str(int(ch)) for ch in digits).lstrip('0')
+    if not digits:
+        return '0'
+    return '-' + digits if sign == '-' else digits
+
+
+def read_number(prompt_text="Enter a whole number: "):
+    # split_number() of one input line: (sign, digits), or None if invalid
     try:
         s = input(prompt_text)
     except EOFError:
         print("\nNo input received. Exiting.", file=sys.stderr)
         sys.exit(1)
-    if s is None:
-        print("No input. Exiting.", file=sys.stderr)
+    return split_number(s)
+
+
+def file_parity(path, chunk_size=READ_CHUNK_SIZE):
+    # Parity of the single number in a text file, which may be surrounded
+    # by whitespace. Returns (parity, digit_count); raises ValueError when
+    # the file does not hold exactly one whole number.
+    started = False     # past leading whitespace and the sign
+    ended = False       # trailing whitespace seen
+    last = None
+    count = 0
+    with open(path, encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            if not started:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                if chunk[0] in '+-':
+                    chunk = chunk[1:]
+                started = True
+            body = chunk.rstrip()
+            if body:
+                if ended or not body.isdecimal():
+                    raise ValueError(f"{path} does not contain a single whole number")
+                last = body[-1]
+                count += len(body)
+            if len(body) < len(chunk):
+                ended = True
+    if last is None:
+        raise ValueError(f"{path} does not contain a whole number")
+    return PARITIES[int(last) & 1], count
+
+
+def classify_lines(lines, totals):
+    # bytes lines -> output bytes for the chunk; totals is a list of
+    # even/odd/invalid counts updated in place
+    out = []
+    append = out.append
+    for line in lines:
+        if line.isdigit():
+            # plain ASCII digits (bytes.isdigit), by far the common case
+            i = line[-1] & 1
+        else:
+            parts = split_number(line.decode('utf-8', 'replace'))
+            i = 2 if parts is None else int(parts[1][-1]) & 1
+        totals[i] += 1
+        append(PARITIES[i])
+    out.append('')
+    return '\n'.join(out).encode('ascii')
+
+
+def classify_stream(infile, outfile, chunk_size=READ_CHUNK_SIZE):
+    totals = [0] * len(PARITIES)
+    while True:
+        lines = infile.readlines(chunk_size)
+        if not lines:
+            break
+        # readlines() keeps the line endings; digits-only lines need them gone
+        text = classify_lines([line.rstrip(b'\r\n') for line in lines], totals)
+        if outfile is not None:
+            outfile.write(text)
+    return totals
+
+
+def lines_main(args):
+    summary_only = '--summary-only' in args
+    if summary_only:
+        args.remove('--summary-only')
+    path = args[0] if args else '-'
+    outfile = None
+    if not summary_only:
+        outfile = open(sys.stdout.fileno(), 'wb', buffering=READ_CHUNK_SIZE, closefd=False)
+    started = time.perf_counter()
+    try:
+        if path == '-':
+            totals = classify_stream(sys.stdin.buffer, outfile)
+        else:
+            with open(path, 'rb', buffering=READ_CHUNK_SIZE) as f:
+                totals = classify_stream(f, outfile)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
         sys.exit(1)
-    s = s.strip()
-    if not s:
-        return None
-    # Accept optional leading + or - and digits
-    if (s[0] in '+-' and s[1:].isdigit()) or s.isdigit():
-        try:
-            return int(s)
-        except ValueError:
-            return None
-    return None
+    finally:
+        if outfile is not None:
+            outfile.flush()
+    elapsed = time.perf_counter() - started
+    file = sys.stdout if summary_only else sys.stderr
+    count = sum(totals)
+    print(f"Lines: {count}", file=file)
+    for name, n in zip(PARITIES, totals):
+        print(f"{name:8}: {n}", file=file)
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Throughput: {rate / 1e6:.2f} M lines/sec ({elapsed:.2f} s)", file=file)
+
+
+def file_main(args):
+    if len(args) != 1:
+        print("Usage: odd_or_even.py --file NUMBER_FILE", file=sys.stderr)
+        sys.exit(1)
+    try:
+        result, count = file_parity(args[0])
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:  # includes UnicodeDecodeError
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(f"The {count}-digit number is {result}.")
 
 
 def main():
-    n = read_int()
-    while n is None:
+    if len(sys.argv) >= 2 and sys.argv[1] == '--file':
+        file_main(sys.argv[2:])
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == '--lines':
+        lines_main(sys.argv[2:])
+        return
+
+    parts = read_number()
+    while parts is None:
         print("Please enter a valid whole number.")
-        n = read_int()
+        parts = read_number()
 
-    if n % 2 == 0:
-        print(f"{n} is even.")
-    else:
+    n = canonical_number(*parts)
+    if int(parts[1][-1]) & 1:
         print(f"{n} is odd.")
+    else:
+        print(f"{n} is even.")
 
 
 if __name__ == '__main__':
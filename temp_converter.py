@@ -5,8 +5,27 @@ Temperature converter: Fahrenheit -> Celsius and Kelvin
 - Validates input and prints results with sensible formatting
 
 Note: You wrote "Kevin" in the prompt — I assume you meant Kelvin.
+
+f_to_c/f_to_k use the shared factors in unit_conversion.py and accept a
+single number or a whole NumPy/array.array buffer.
+
+Binary mode (bulk telemetry, no text decoding):
+  python3 temp_converter.py --binary input.f64 celsius.f64 kelvin.f64
+  python3 temp_converter.py --binary input.f32 celsius.f32 kelvin.f32 --float32
+
+The input is raw little-endian float64 (or float32) Fahrenheit values. It is
+memory-mapped and converted in fixed-size chunks; the Celsius and Kelvin
+files are written in the same format, one value per input value.
 """
+import mmap
 import sys
+from array import array
+
+from unit_conversion import convert
+
+
+# Values converted per chunk in binary mode
+BINARY_CHUNK_VALUES = 1 << 20
 
 
 def read_temperature(prompt_text="Enter temperature in °F: "):
@@ -30,15 +49,87 @@ def read_temperature(prompt_text="Enter temperature in °F: "):
         return None
 
 
-def f_to_c(f):
-    return (f - 32.0) * 5.0 / 9.0
+def f_to_c(f, out=None):
+    return convert(f, 'F', 'C', out=out)
+
+
+def f_to_k(f, out=None):
+    return convert(f, 'F', 'K', out=out)
+
+
+def _convert_chunks_numpy(np, data, count, itemsize, c_file, k_file):
+    dtype = np.dtype('<f8' if itemsize == 8 else '<f4')
+    c_buf = np.empty(BINARY_CHUNK_VALUES, dtype=dtype)
+    k_buf = np.empty(BINARY_CHUNK_VALUES, dtype=dtype)
+    for start in range(0, count, BINARY_CHUNK_VALUES):
+        n = min(BINARY_CHUNK_VALUES, count - start)
+        chunk = np.frombuffer(data, dtype=dtype, count=n, offset=start * itemsize)
+        c_file.write(memoryview(f_to_c(chunk, out=c_buf[:n])))
+        k_file.write(memoryview(f_to_k(chunk, out=k_buf[:n])))
 
 
-def f_to_k(f):
-    return f_to_c(f) + 273.15
+def _convert_chunks_array(data, count, itemsize, c_file, k_file):
+    # Without NumPy: array.array chunks, byte-swapped on big-endian hosts
+    typecode = 'd' if itemsize == 8 else 'f'
+    swap = sys.byteorder == 'big'
+    for start in range(0, count, BINARY_CHUNK_VALUES):
+        n = min(BINARY_CHUNK_VALUES, count - start)
+        chunk = array(typecode)
+        chunk.frombytes(data[start * itemsize:(start + n) * itemsize])
+        if swap:
+            chunk.byteswap()
+        for out, result in ((c_file, f_to_c(chunk)), (k_file, f_to_k(chunk))):
+            if swap:
+                result.byteswap()
+            result.tofile(out)
+
+
+def convert_binary_file(in_path, c_path, k_path, itemsize=8):
+    # Returns the number of values converted
+    with open(in_path, 'rb') as f, open(c_path, 'wb') as c_file, open(k_path, 'wb') as k_file:
+        size = f.seek(0, 2)
+        if size % itemsize:
+            raise ValueError(f"{in_path}: size {size} is not a multiple of {itemsize} bytes")
+        count = size // itemsize
+        if count == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            try:
+                import numpy as np
+            except ImportError:
+                np = None
+            if np is not None:
+                _convert_chunks_numpy(np, data, count, itemsize, c_file, k_file)
+            else:
+                _convert_chunks_array(data, count, itemsize, c_file, k_file)
+    return count
+
+
+def binary_main(args):
+    itemsize = 8
+    if '--float32' in args:
+        args.remove('--float32')
+        itemsize = 4
+    if len(args) < 3:
+        print("Usage: temp_converter.py --binary INPUT CELSIUS_OUT KELVIN_OUT [--float32]",
+              file=sys.stderr)
+        sys.exit(1)
+    try:
+        count = convert_binary_file(args[0], args[1], args[2], itemsize)
+    except OSError as e:
+        print(f"Cannot open {e.filename}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(f"Converted {count} values", file=sys.stderr)
 
 
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--binary':
+        binary_main(sys.argv[2:])
+        return
+
     f = read_temperature()
     # keep prompting until valid
     while f is None:
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+unit_conversion.py
+Shared conversion engine behind feet_converter.py, temp_converter.py and
+hours_to_minutes_seconds.py.
+
+Every unit is registered as an affine map onto its dimension's base unit:
+  base = value * scale + offset
+so plain ratios (feet -> meters) and offset scales (Fahrenheit -> Kelvin) use
+the same code. Scales and offsets are kept as exact fractions; the factors
+for a (from, to) pair are derived once, rounded to float once, and cached.
+
+convert() accepts a single number, a NumPy array or an array.array buffer
+and converts the whole thing in one call (NumPy element-wise when it is
+available, otherwise one Python loop over the buffer).
+
+Usage:
+  python3 unit_conversion.py ft m 5280
+  printf '32\n212\n' | python3 unit_conversion.py F C
+  python3 unit_conversion.py --list
+"""
+import sys
+from array import array
+from fractions import Fraction
+from functools import lru_cache
+
+
+# name -> (dimension, scale, offset), all relative to the dimension's base
+UNITS = {}
+# alias -> canonical name
+ALIASES = {}
+
+
+def register_unit(name, dimension, scale, offset=0, aliases=()):
+    UNITS[name] = (dimension, Fraction(scale), Fraction(offset))
+    ALIASES[name] = name
+    for alias in aliases:
+        ALIASES[alias] = name
+    conversion_factors.cache_clear()
+
+
+def resolve_unit(name):
+    try:
+        return ALIASES[name]
+    except KeyError:
+        raise ValueError(f"Unknown unit: {name}") from None
+
+
+@lru_cache(maxsize=None)
+def conversion_factors(src, dst):
+    # (scale, offset) so that dst_value = src_value * scale + offset
+    src = resolve_unit(src)
+    dst = resolve_unit(dst)
+    src_dim, src_scale, src_offset = UNITS[src]
+    dst_dim, dst_scale, dst_offset = UNITS[dst]
+    if src_dim != dst_dim:
+        raise ValueError(f"Cannot convert {src_dim} ({src}) to {dst_dim} ({dst})")
+    return float(src_scale / dst_scale), float((src_offset - dst_offset) / dst_scale)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def convert(values, src, dst, out=None):
+    # Scalars come back as floats, NumPy arrays as arrays (written into
+    # `out` when given, which may be `values` itself), array.array buffers
+    # as a new array of the same float typecode ('d' for integer input).
+    scale, offset = conversion_factors(src, dst)
+    if isinstance(values, (int, float)):
+        return values * scale + offset
+
+    np = sys.modules.get('numpy')
+    if np is not None and isinstance(values, np.ndarray):
+        if out is None:
+            dtype = values.dtype if values.dtype.kind == 'f' else np.float64
+            out = np.empty(values.shape, dtype=dtype)
+        np.multiply(values, scale, out=out)
+        if offset:
+            np.add(out, offset, out=out)
+        return out
+
+    if isinstance(values, array):
+        typecode = values.typecode if values.typecode in 'fd' else 'd'
+        np = _numpy()
+        if np is None:
+            return array(typecode, [v * scale + offset for v in values])
+        result = array(typecode, bytes(len(values) * array(typecode).itemsize))
+        convert(np.frombuffer(values, dtype=values.typecode), src, dst,
+                out=np.frombuffer(result, dtype=typecode))
+        return result
+
+    return [v * scale + offset for v in values]
+
+
+# Length (base: meter). The foot and inch are defined exactly in meters.
+register_unit('m', 'length', 1, aliases=('meter', 'meters'))
+register_unit('ft', 'length', Fraction('0.3048'), aliases=('foot', 'feet'))
+register_unit('in', 'length', Fraction('0.0254'), aliases=('inch', 'inches'))
+register_unit('yd', 'length', Fraction('0.3048') * 3, aliases=('yard', 'yards'))
+register_unit('mi', 'length', Fraction('0.3048') * 5280, aliases=('mile', 'miles'))
+# 1 league = 3 miles (common definition)
+register_unit('league', 'length', Fraction('0.3048') * 5280 * 3, aliases=('leagues',))
+
+# Temperature (base: kelvin)
+register_unit('K', 'temperature', 1, aliases=('kelvin',))
+register_unit('C', 'temperature', 1, Fraction('273.15'), aliases=('celsius',))
+register_unit('F', 'temperature', Fraction(5, 9), Fraction('273.15') - Fraction(160, 9),
+              aliases=('fahrenheit',))
+
+# Time (base: second)
+register_unit('s', 'time', 1, aliases=('sec', 'second', 'seconds'))
+register_unit('min', 'time', 60, aliases=('minute', 'minutes'))
+register_unit('h', 'time', 3600, aliases=('hr', 'hour', 'hours'))
+
+
+def main():
+    args = sys.argv[1:]
+    if args == ['--list']:
+        for name, (dim, _, _) in UNITS.items():
+            aliases = [a for a, n in ALIASES.items() if n == name and a != name]
+            print(f"{name:8} {dim:12} {', '.join(aliases)}")
+        return
+    if len(args) < 2:
+        print("Usage: unit_conversion.py FROM TO [VALUE ...]  (values from stdin if omitted)",
+              file=sys.stderr)
+        sys.exit(1)
+    src, dst = args[0], args[1]
+    try:
+        conversion_factors(src, dst)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    lines = args[2:] if len(args) > 2 else sys.stdin
+    values = array('d')
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            values.append(float(line))
+        except ValueError:
+            print(f"Invalid number: {line}", file=sys.stderr)
+            sys.exit(1)
+    if values:
+        print('\n'.join(map(repr, convert(values, src, dst))))
+
+
+if __name__ == '__main__':
+    main()